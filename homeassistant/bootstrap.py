@@ -471,6 +471,14 @@ async def _async_set_up_integrations(
 
     _LOGGER.info("Domains to be set up: %s", domains_to_setup)
 
+    # Import the integrations and their platforms in the executor while
+    # the integrations are set up, instead of one by one on the loop
+    hass.async_create_task(
+        loader.async_preload_integrations(
+            hass, integration_cache.values(), domains_to_setup | {"config"}
+        )
+    )
+
     logging_domains = domains_to_setup & LOGGING_INTEGRATIONS
 
     # Load logging as soon as possible
@@ -550,3 +558,6 @@ async def _async_set_up_integrations(
             await hass.async_block_till_done()
     except asyncio.TimeoutError:
         _LOGGER.warning("Setup timed out for bootstrap - moving forward")
+
+    # Next start resolves the integrations set up now without reading manifests
+    await loader.async_save_integration_index(hass)
@@ -43,6 +43,7 @@ from homeassistant.helpers.script import (
     ATTR_MODE,
     CONF_MAX,
     CONF_MAX_EXCEEDED,
+    ReferenceIndex,
     Script,
 )
 from homeassistant.helpers.script_variables import ScriptVariables
@@ -76,6 +77,8 @@ CONF_SKIP_CONDITION = "skip_condition"
 CONF_STOP_ACTIONS = "stop_actions"
 DEFAULT_STOP_ACTIONS = True
 
+DATA_REFERENCE_INDEX = "automation_reference_index"
+
 EVENT_AUTOMATION_RELOADED = "automation_reloaded"
 EVENT_AUTOMATION_TRIGGERED = "automation_triggered"
 
@@ -103,13 +106,7 @@ def automations_with_entity(hass: HomeAssistant, entity_id: str) -> List[str]:
     if DOMAIN not in hass.data:
         return []
 
-    component = hass.data[DOMAIN]
-
-    return [
-        automation_entity.entity_id
-        for automation_entity in component.entities
-        if entity_id in automation_entity.referenced_entities
-    ]
+    return hass.data[DATA_REFERENCE_INDEX].async_referencing_entity(entity_id)
 
 
 @callback
@@ -134,13 +131,7 @@ def automations_with_device(hass: HomeAssistant, device_id: str) -> List[str]:
     if DOMAIN not in hass.data:
         return []
 
-    component = hass.data[DOMAIN]
-
-    return [
-        automation_entity.entity_id
-        for automation_entity in component.entities
-        if device_id in automation_entity.referenced_devices
-    ]
+    return hass.data[DATA_REFERENCE_INDEX].async_referencing_device(device_id)
 
 
 @callback
@@ -162,6 +153,7 @@ def devices_in_automation(hass: HomeAssistant, entity_id: str) -> List[str]:
 async def async_setup(hass, config):
     """Set up the automation."""
     hass.data[DOMAIN] = component = EntityComponent(LOGGER, DOMAIN, hass)
+    hass.data[DATA_REFERENCE_INDEX] = ReferenceIndex()
 
     # To register the automation blueprints
     async_get_blueprints(hass)
@@ -312,6 +304,10 @@ class AutomationEntity(ToggleEntity, RestoreEntity):
         """Startup with initial state or previous state."""
         await super().async_added_to_hass()
 
+        self.hass.data[DATA_REFERENCE_INDEX].async_add(
+            self.entity_id, self.referenced_entities, self.referenced_devices
+        )
+
         self._logger = logging.getLogger(
             f"{__name__}.{split_entity_id(self.entity_id)[1]}"
         )
@@ -410,6 +406,7 @@ class AutomationEntity(ToggleEntity, RestoreEntity):
     async def async_will_remove_from_hass(self):
         """Remove listeners when removing automation from Home Assistant."""
         await super().async_will_remove_from_hass()
+        self.hass.data[DATA_REFERENCE_INDEX].async_remove(self.entity_id)
         await self.async_disable()
 
     async def async_enable(self):
@@ -8,13 +8,10 @@ the user has submitted configuration information.
 """
 import functools as ft
 
-from homeassistant.const import (
-    ATTR_ENTITY_PICTURE,
-    ATTR_FRIENDLY_NAME,
-    EVENT_TIME_CHANGED,
-)
-from homeassistant.core import Event, callback as async_callback
+from homeassistant.const import ATTR_ENTITY_PICTURE, ATTR_FRIENDLY_NAME
+from homeassistant.core import callback as async_callback
 from homeassistant.helpers.entity import async_generate_entity_id
+from homeassistant.helpers.event import async_call_later
 from homeassistant.loader import bind_hass
 from homeassistant.util.async_ import run_callback_threadsafe
 
@@ -212,11 +209,12 @@ class Configurator:
         # it shortly after so that it is deleted when the client updates.
         self.hass.states.async_set(entity_id, STATE_CONFIGURED)
 
-        def deferred_remove(event: Event):
+        @async_callback
+        def deferred_remove(now):
             """Remove the request state."""
-            self.hass.states.async_remove(entity_id, context=event.context)
+            self.hass.states.async_remove(entity_id)
 
-        self.hass.bus.async_listen_once(EVENT_TIME_CHANGED, deferred_remove)
+        async_call_later(self.hass, 1, deferred_remove)
 
     async def async_handle_service_call(self, call):
         """Handle a configure service call."""
@@ -1,13 +1,16 @@
 """Provide pre-made queries on top of the recorder component."""
+import asyncio
 from collections import defaultdict
 from datetime import datetime as dt, timedelta
-from itertools import groupby
+from itertools import chain, groupby, islice
 import json
 import logging
+import threading
 import time
 from typing import Iterable, Optional, cast
 
 from aiohttp import web
+from aiohttp.hdrs import CONTENT_TYPE
 from sqlalchemy import and_, bindparam, func, not_, or_
 from sqlalchemy.ext import baked
 import voluptuous as vol
@@ -15,16 +18,19 @@ import voluptuous as vol
 from homeassistant.components import recorder
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
+    StateAttributes,
     States,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
 )
+from homeassistant.components.recorder.statistics import statistics_during_period
 from homeassistant.components.recorder.util import execute, session_scope
 from homeassistant.const import (
     CONF_DOMAINS,
     CONF_ENTITIES,
     CONF_EXCLUDE,
     CONF_INCLUDE,
+    CONTENT_TYPE_JSON,
     HTTP_BAD_REQUEST,
 )
 from homeassistant.core import Context, State, split_entity_id
@@ -33,6 +39,7 @@ from homeassistant.helpers.entityfilter import (
     CONF_ENTITY_GLOBS,
     INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA,
 )
+from homeassistant.helpers.json import JSONEncoder
 from homeassistant.helpers.typing import HomeAssistantType
 import homeassistant.util.dt as dt_util
 
@@ -79,13 +86,28 @@ QUERY_STATES = [
     States.domain,
     States.entity_id,
     States.state,
-    States.attributes,
+    # States written before attributes were deduplicated store them inline
+    func.coalesce(States.attributes, StateAttributes.shared_attrs).label("attributes"),
     States.last_changed,
     States.last_updated,
 ]
 
 HISTORY_BAKERY = "history_bakery"
 
+# Number of rows fetched from the database cursor at once when streaming
+STREAM_BATCH_SIZE = 1000
+# Number of states serialized per chunk of a streamed response
+STREAM_CHUNK_SIZE = 500
+# Number of serialized chunks buffered for a streamed response
+STREAM_QUEUE_SIZE = 4
+
+
+def _query_states(session):
+    """Return a query for QUERY_STATES joined with the shared attributes."""
+    return session.query(*QUERY_STATES).outerjoin(
+        StateAttributes, States.attributes_id == StateAttributes.attributes_id
+    )
+
 
 def get_significant_states(hass, *args, **kwargs):
     """Wrap _get_significant_states with a sql session."""
@@ -113,10 +135,40 @@ def _get_significant_states(
     """
     timer_start = time.perf_counter()
 
-    baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
+    states = execute(
+        _significant_states_query(
+            hass,
+            session,
+            start_time,
+            end_time,
+            entity_ids,
+            filters,
+            significant_changes_only,
+        )
+    )
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        elapsed = time.perf_counter() - timer_start
+        _LOGGER.debug("get_significant_states took %fs", elapsed)
+
+    return _sorted_states_to_json(
+        hass,
+        session,
+        states,
+        start_time,
+        entity_ids,
+        filters,
+        include_start_time_state,
+        minimal_response,
     )
 
+
+def _significant_states_query(
+    hass, session, start_time, end_time, entity_ids, filters, significant_changes_only
+):
+    """Return the query of the significant states sorted by entity_id."""
+    baked_query = hass.data[HISTORY_BAKERY](_query_states)
+
     if significant_changes_only:
         baked_query += lambda q: q.filter(
             (
@@ -142,34 +194,69 @@ def _get_significant_states(
 
     baked_query += lambda q: q.order_by(States.entity_id, States.last_updated)
 
-    states = execute(
-        baked_query(session).params(
-            start_time=start_time, end_time=end_time, entity_ids=entity_ids
-        )
+    return baked_query(session).params(
+        start_time=start_time, end_time=end_time, entity_ids=entity_ids
     )
 
-    if _LOGGER.isEnabledFor(logging.DEBUG):
-        elapsed = time.perf_counter() - timer_start
-        _LOGGER.debug("get_significant_states took %fs", elapsed)
 
-    return _sorted_states_to_json(
+def stream_significant_states(
+    hass,
+    session,
+    start_time,
+    end_time=None,
+    entity_ids=None,
+    filters=None,
+    include_start_time_state=True,
+    significant_changes_only=True,
+    minimal_response=False,
+):
+    """Yield the significant states of each entity during a UTC period.
+
+    Yields an (entity_id, states) tuple per entity, states is an iterator
+    that must be consumed before advancing to the next entity. The rows are
+    fetched from the database cursor in batches, so memory use does not
+    depend on the length of the period. Entities are ordered by entity_id,
+    followed by the entities that only have a state at start_time.
+    """
+    start_states = {}
+    if include_start_time_state:
+        run = recorder.run_information_from_instance(hass, start_time)
+        for state in _get_states_with_session(
+            hass, session, start_time, entity_ids, run=run, filters=filters
+        ):
+            state.last_changed = start_time
+            state.last_updated = start_time
+            start_states[state.entity_id] = state
+
+    query = _significant_states_query(
         hass,
         session,
-        states,
         start_time,
+        end_time,
         entity_ids,
         filters,
-        include_start_time_state,
-        minimal_response,
-    )
+        significant_changes_only,
+    ).with_post_criteria(lambda q: q.yield_per(STREAM_BATCH_SIZE))
+
+    for ent_id, group in groupby(query, lambda state: state.entity_id):
+        start_state = start_states.pop(ent_id, None)
+        minimal = (
+            minimal_response
+            and split_entity_id(ent_id)[0] not in NEED_ATTRIBUTE_DOMAINS
+        )
+        states = _iter_entity_states(start_state, group, minimal)
+        if start_state is not None:
+            states = chain((start_state,), states)
+        yield ent_id, states
+
+    for ent_id, start_state in start_states.items():
+        yield ent_id, iter((start_state,))
 
 
 def state_changes_during_period(hass, start_time, end_time=None, entity_id=None):
     """Return states changes during UTC period start_time - end_time."""
     with session_scope(hass=hass) as session:
-        baked_query = hass.data[HISTORY_BAKERY](
-            lambda session: session.query(*QUERY_STATES)
-        )
+        baked_query = hass.data[HISTORY_BAKERY](_query_states)
 
         baked_query += lambda q: q.filter(
             (States.last_changed == States.last_updated)
@@ -182,7 +269,9 @@ def state_changes_during_period(hass, start_time, end_time=None, entity_id=None)
             )
 
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
+            baked_query += lambda q: q.filter(
+                States.entity_id == bindparam("entity_id")
+            )
             entity_id = entity_id.lower()
 
         baked_query += lambda q: q.order_by(States.entity_id, States.last_updated)
@@ -203,13 +292,13 @@ def get_last_state_changes(hass, number_of_states, entity_id):
     start_time = dt_util.utcnow()
 
     with session_scope(hass=hass) as session:
-        baked_query = hass.data[HISTORY_BAKERY](
-            lambda session: session.query(*QUERY_STATES)
-        )
+        baked_query = hass.data[HISTORY_BAKERY](_query_states)
         baked_query += lambda q: q.filter(States.last_changed == States.last_updated)
 
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
+            baked_query += lambda q: q.filter(
+                States.entity_id == bindparam("entity_id")
+            )
             entity_id = entity_id.lower()
 
         baked_query += lambda q: q.order_by(
@@ -270,7 +359,7 @@ def _get_states_with_session(
     # We have more than one entity to look at (most commonly we want
     # all entities,) so we need to do a search on all states since the
     # last recorder run started.
-    query = session.query(*QUERY_STATES)
+    query = _query_states(session)
 
     most_recent_states_by_date = session.query(
         States.entity_id.label("max_entity_id"),
@@ -318,9 +407,7 @@ def _get_states_with_session(
 def _get_single_entity_states_with_session(hass, session, utc_point_in_time, entity_id):
     # Use an entirely different (and extremely fast) query if we only
     # have a single entity id
-    baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
-    )
+    baked_query = hass.data[HISTORY_BAKERY](_query_states)
     baked_query += lambda q: q.filter(
         States.last_updated < bindparam("utc_point_in_time"),
         States.entity_id == bindparam("entity_id"),
@@ -377,53 +464,71 @@ def _sorted_states_to_json(
         elapsed = time.perf_counter() - timer_start
         _LOGGER.debug("getting %d first datapoints took %fs", len(result), elapsed)
 
-    # Called in a tight loop so cache the function
-    # here
-    _process_timestamp_to_utc_isoformat = process_timestamp_to_utc_isoformat
-
     # Append all changes to it
     for ent_id, group in groupby(states, lambda state: state.entity_id):
-        domain = split_entity_id(ent_id)[0]
         ent_results = result[ent_id]
-        if not minimal_response or domain in NEED_ATTRIBUTE_DOMAINS:
-            ent_results.extend(LazyState(db_state) for db_state in group)
-
-        # With minimal response we only provide a native
-        # State for the first and last response. All the states
-        # in-between only provide the "state" and the
-        # "last_changed".
-        if not ent_results:
-            ent_results.append(LazyState(next(group)))
-
-        prev_state = ent_results[-1]
-        initial_state_count = len(ent_results)
-
-        for db_state in group:
-            # With minimal response we do not care about attribute
-            # changes so we can filter out duplicate states
-            if db_state.state == prev_state.state:
-                continue
-
-            ent_results.append(
-                {
-                    STATE_KEY: db_state.state,
-                    LAST_CHANGED_KEY: _process_timestamp_to_utc_isoformat(
-                        db_state.last_changed
-                    ),
-                }
+        minimal = (
+            minimal_response
+            and split_entity_id(ent_id)[0] not in NEED_ATTRIBUTE_DOMAINS
+        )
+        ent_results.extend(
+            _iter_entity_states(
+                ent_results[-1] if ent_results else None, group, minimal
             )
-            prev_state = db_state
-
-        if prev_state and len(ent_results) != initial_state_count:
-            # There was at least one state change
-            # replace the last minimal state with
-            # a full state
-            ent_results[-1] = LazyState(prev_state)
+        )
 
     # Filter out the empty lists if some states had 0 results.
     return {key: val for key, val in result.items() if val}
 
 
+def _iter_entity_states(prev_state, rows, minimal_response):
+    """Yield the JSON friendly states of one entity.
+
+    rows are the database rows of the entity sorted by last_updated and
+    prev_state is the state that precedes them, if any.
+    """
+    if not minimal_response:
+        for row in rows:
+            yield LazyState(row)
+        return
+
+    # With minimal response we only provide a native
+    # State for the first and last response. All the states
+    # in-between only provide the "state" and the
+    # "last_changed".
+    if prev_state is None:
+        prev_state = next(rows, None)
+        if prev_state is None:
+            return
+        yield LazyState(prev_state)
+
+    # Called in a tight loop so cache the function
+    # here
+    _process_timestamp_to_utc_isoformat = process_timestamp_to_utc_isoformat
+
+    # The last change is held back so it can be replaced by a full state
+    pending = None
+    for row in rows:
+        # With minimal response we do not care about attribute
+        # changes so we can filter out duplicate states
+        if row.state == prev_state.state:
+            continue
+
+        if pending is not None:
+            yield pending
+        pending = {
+            STATE_KEY: row.state,
+            LAST_CHANGED_KEY: _process_timestamp_to_utc_isoformat(row.last_changed),
+        }
+        prev_state = row
+
+    if pending is not None:
+        # There was at least one state change
+        # replace the last minimal state with
+        # a full state
+        yield LazyState(prev_state)
+
+
 def get_state(hass, utc_point_in_time, entity_id, run=None):
     """Return a state at a specific point in time."""
     states = get_states(hass, utc_point_in_time, (entity_id,), run)
@@ -501,6 +606,7 @@ class HistoryPeriodView(HomeAssistantView):
         )
 
         minimal_response = "minimal_response" in request.query
+        downsample = "downsample" in request.query
 
         hass = request.app["hass"]
 
@@ -511,6 +617,18 @@ class HistoryPeriodView(HomeAssistantView):
         ):
             return self.json([])
 
+        if "stream" in request.query and not downsample:
+            return await self._async_stream_significant_states_json(
+                request,
+                hass,
+                start_time,
+                end_time,
+                entity_ids,
+                include_start_time_state,
+                significant_changes_only,
+                minimal_response,
+            )
+
         return cast(
             web.Response,
             await hass.async_add_executor_job(
@@ -522,6 +640,7 @@ class HistoryPeriodView(HomeAssistantView):
                 include_start_time_state,
                 significant_changes_only,
                 minimal_response,
+                downsample,
             ),
         )
 
@@ -534,22 +653,48 @@ class HistoryPeriodView(HomeAssistantView):
         include_start_time_state,
         significant_changes_only,
         minimal_response,
+        downsample=False,
     ):
         """Fetch significant stats from the database as json."""
         timer_start = time.perf_counter()
 
-        with session_scope(hass=hass) as session:
-            result = _get_significant_states(
-                hass,
-                session,
-                start_time,
-                end_time,
-                entity_ids,
-                self.filters,
-                include_start_time_state,
-                significant_changes_only,
-                minimal_response,
+        # Entities with long-term statistics are served from the hourly
+        # statistics instead of their raw states
+        statistics = {}
+        if downsample and entity_ids:
+            statistics = statistics_during_period(
+                hass, start_time, end_time, entity_ids
             )
+            raw_entity_ids = [
+                entity_id for entity_id in entity_ids if entity_id not in statistics
+            ]
+        else:
+            raw_entity_ids = entity_ids
+
+        if raw_entity_ids or not statistics:
+            with session_scope(hass=hass) as session:
+                result = _get_significant_states(
+                    hass,
+                    session,
+                    start_time,
+                    end_time,
+                    raw_entity_ids,
+                    self.filters,
+                    include_start_time_state,
+                    significant_changes_only,
+                    minimal_response,
+                )
+        else:
+            result = {}
+
+        if statistics:
+            result = {
+                entity_id: _statistics_to_states(entity_id, statistics[entity_id])
+                if entity_id in statistics
+                else result.get(entity_id)
+                for entity_id in entity_ids
+            }
+            result = {key: val for key, val in result.items() if val}
 
         result = list(result.values())
         if _LOGGER.isEnabledFor(logging.DEBUG):
@@ -571,6 +716,138 @@ class HistoryPeriodView(HomeAssistantView):
 
         return self.json(result)
 
+    async def _async_stream_significant_states_json(
+        self,
+        request,
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+    ):
+        """Stream significant states from the database as chunked json.
+
+        The executor job hands over the serialized chunks through a bounded
+        queue, which holds it back while the client reads slowly.
+        """
+        queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        closed = threading.Event()
+
+        def put_chunk(chunk):
+            """Hand a chunk to the response, return False if it was closed."""
+            if closed.is_set():
+                return False
+            asyncio.run_coroutine_threadsafe(queue.put(chunk), hass.loop).result()
+            return True
+
+        response = web.StreamResponse(headers={CONTENT_TYPE: CONTENT_TYPE_JSON})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+
+        job = hass.async_add_executor_job(
+            self._stream_significant_states_json,
+            put_chunk,
+            hass,
+            start_time,
+            end_time,
+            entity_ids,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+        )
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    break
+                await response.write(chunk)
+        finally:
+            closed.set()
+            # Unblock the executor job if it waits for room in the queue
+            while not queue.empty():
+                queue.get_nowait()
+            await job
+
+        await response.write_eof()
+        return response
+
+    def _stream_significant_states_json(
+        self,
+        put_chunk,
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        include_start_time_state,
+        significant_changes_only,
+        minimal_response,
+    ):
+        """Fetch significant states from the database as json chunks."""
+        timer_start = time.perf_counter()
+        state_count = 0
+        try:
+            with session_scope(hass=hass) as session:
+                separator = b"["
+                for _, states in stream_significant_states(
+                    hass,
+                    session,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    self.filters,
+                    include_start_time_state,
+                    significant_changes_only,
+                    minimal_response,
+                ):
+                    if not put_chunk(separator + b"["):
+                        return
+                    separator = b","
+
+                    chunk_separator = b""
+                    while True:
+                        chunk = list(islice(states, STREAM_CHUNK_SIZE))
+                        if not chunk:
+                            break
+                        state_count += len(chunk)
+                        if not put_chunk(chunk_separator + _json_list_items(chunk)):
+                            return
+                        chunk_separator = b","
+
+                    if not put_chunk(b"]"):
+                        return
+
+                put_chunk(b"[]" if separator == b"[" else b"]")
+        finally:
+            put_chunk(None)
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            elapsed = time.perf_counter() - timer_start
+            _LOGGER.debug("Streamed %d states in %fs", state_count, elapsed)
+
+
+def _json_list_items(items):
+    """Serialize items as the comma separated body of a json list."""
+    return json.dumps(items, cls=JSONEncoder, allow_nan=False).encode("UTF-8")[1:-1]
+
+
+def _statistics_to_states(entity_id, statistics):
+    """Convert hourly statistics to states with the mean as state."""
+    context = Context(id=None)
+    return [
+        State(
+            entity_id,
+            str(stats["mean"]),
+            {"min": stats["min"], "max": stats["max"], "sum": stats["sum"]},
+            stats["start"],
+            stats["start"],
+            context,
+            validate_entity_id=False,
+        )
+        for stats in statistics
+    ]
+
 
 def sqlalchemy_filter_from_include_exclude_conf(conf):
     """Build a sql filter from config."""
@@ -15,10 +15,9 @@ from homeassistant.const import (
 )
 from homeassistant.core import CALLBACK_TYPE, HassJob, callback
 from homeassistant.helpers import condition, config_validation as cv, template
-from homeassistant.helpers.event import (
-    async_track_same_state,
-    async_track_state_change_event,
-)
+from homeassistant.helpers.event import async_track_same_state
+
+from .state_engine import async_get_engine
 
 # mypy: allow-incomplete-defs, allow-untyped-calls, allow-untyped-defs
 # mypy: no-check-untyped-defs
@@ -149,7 +148,8 @@ async def async_attach_trigger(
                         ex,
                     )
                     entities_triggered.discard(entity_id)
-                    return
+                    # Check the next change even if it crosses no threshold
+                    return False
 
                 unsub_track_same[entity_id] = async_track_same_state(
                     hass,
@@ -161,7 +161,9 @@ async def async_attach_trigger(
             else:
                 call_action()
 
-    unsub = async_track_state_change_event(hass, entity_ids, state_automation_listener)
+    unsub = async_get_engine(hass).async_attach_numeric_state_trigger(
+        entity_ids, state_automation_listener, below, above, value_template, attribute
+    )
 
     @callback
     def async_remove():
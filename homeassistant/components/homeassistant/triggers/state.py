@@ -12,10 +12,11 @@ from homeassistant.helpers import config_validation as cv, template
 from homeassistant.helpers.event import (
     Event,
     async_track_same_state,
-    async_track_state_change_event,
     process_state_match,
 )
 
+from .state_engine import async_get_engine
+
 # mypy: allow-incomplete-defs, allow-untyped-calls, allow-untyped-defs
 # mypy: no-check-untyped-defs
 
@@ -184,7 +185,9 @@ async def async_attach_trigger(
             entity_ids=entity,
         )
 
-    unsub = async_track_state_change_event(hass, entity_id, state_automation_listener)
+    unsub = async_get_engine(hass).async_attach_state_trigger(
+        entity_id, state_automation_listener, to_state, attribute
+    )
 
     @callback
     def async_remove():
@@ -0,0 +1,342 @@
+"""Shared dispatch of state changes to the state and numeric_state triggers."""
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from homeassistant.const import MATCH_ALL, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.template import Template
+
+DATA_STATE_TRIGGER_ENGINE = "state_trigger_engine"
+
+TriggerListener = Callable[[Event], Optional[bool]]
+
+
+class _Trigger:
+    """A trigger listening to the state changes of some entities."""
+
+    __slots__ = ("seq", "listener", "attribute")
+
+    def __init__(
+        self, seq: int, listener: TriggerListener, attribute: Optional[str]
+    ) -> None:
+        """Initialize the trigger."""
+        self.seq = seq
+        self.listener = listener
+        self.attribute = attribute
+
+
+class _StateTrigger(_Trigger):
+    """A state trigger, with the states it triggers on if they are fixed."""
+
+    __slots__ = ("to_states",)
+
+    def __init__(
+        self,
+        seq: int,
+        listener: TriggerListener,
+        attribute: Optional[str],
+        to_states: Optional[frozenset],
+    ) -> None:
+        """Initialize the trigger."""
+        super().__init__(seq, listener, attribute)
+        self.to_states = to_states
+
+
+class _NumericStateTrigger(_Trigger):
+    """A numeric_state trigger, with its thresholds if they are fixed."""
+
+    __slots__ = ("thresholds",)
+
+    def __init__(
+        self,
+        seq: int,
+        listener: TriggerListener,
+        attribute: Optional[str],
+        thresholds: Optional[Tuple[float, ...]],
+    ) -> None:
+        """Initialize the trigger."""
+        super().__init__(seq, listener, attribute)
+        self.thresholds = thresholds
+
+
+class EntityTriggers:
+    """Match tables of the triggers listening to one entity.
+
+    A state change is only handed to the triggers that can match it:
+    state triggers by the new state, attribute triggers when their
+    attribute changed and numeric triggers with fixed thresholds when a
+    threshold lies between the old and the new value.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the tables."""
+        self._state_by_to_state: Dict[str, Dict[int, _StateTrigger]] = {}
+        self._state_any_to_state: Dict[int, _StateTrigger] = {}
+        self._state_by_attribute: Dict[str, Dict[int, _StateTrigger]] = {}
+        # Sorted (threshold, seq) crossing points of the fixed numeric triggers
+        self._crossing_points: List[Tuple[float, int]] = []
+        self._numeric: Dict[int, _NumericStateTrigger] = {}
+        # Number of fixed numeric triggers per attribute they read
+        self._numeric_attributes: Dict[Optional[str], int] = {}
+        # Fixed numeric triggers that check the next change regardless of
+        # the crossing points, as they don't know the previous value yet
+        self._numeric_unsettled: Dict[int, _NumericStateTrigger] = {}
+        # Numeric triggers with thresholds or values that can change at any time
+        self._numeric_dynamic: Dict[int, _NumericStateTrigger] = {}
+        self.count = 0
+
+    @callback
+    def async_add(self, trigger: _Trigger) -> None:
+        """Add a trigger to the tables."""
+        self.count += 1
+        if isinstance(trigger, _StateTrigger):
+            if trigger.attribute is not None:
+                self._state_by_attribute.setdefault(trigger.attribute, {})[
+                    trigger.seq
+                ] = trigger
+            elif trigger.to_states is None:
+                self._state_any_to_state[trigger.seq] = trigger
+            else:
+                for to_state in trigger.to_states:
+                    self._state_by_to_state.setdefault(to_state, {})[
+                        trigger.seq
+                    ] = trigger
+            return
+
+        assert isinstance(trigger, _NumericStateTrigger)
+        if trigger.thresholds is None:
+            self._numeric_dynamic[trigger.seq] = trigger
+            return
+
+        self._numeric[trigger.seq] = trigger
+        self._numeric_unsettled[trigger.seq] = trigger
+        self._numeric_attributes[trigger.attribute] = (
+            self._numeric_attributes.get(trigger.attribute, 0) + 1
+        )
+        for threshold in trigger.thresholds:
+            insort(self._crossing_points, (threshold, trigger.seq))
+
+    @callback
+    def async_remove(self, trigger: _Trigger) -> None:
+        """Remove a trigger from the tables."""
+        self.count -= 1
+        if isinstance(trigger, _StateTrigger):
+            if trigger.attribute is not None:
+                _remove_from_table(
+                    self._state_by_attribute, trigger.attribute, trigger.seq
+                )
+            elif trigger.to_states is None:
+                del self._state_any_to_state[trigger.seq]
+            else:
+                for to_state in trigger.to_states:
+                    _remove_from_table(self._state_by_to_state, to_state, trigger.seq)
+            return
+
+        assert isinstance(trigger, _NumericStateTrigger)
+        if trigger.thresholds is None:
+            del self._numeric_dynamic[trigger.seq]
+            return
+
+        del self._numeric[trigger.seq]
+        self._numeric_unsettled.pop(trigger.seq, None)
+        self._numeric_attributes[trigger.attribute] -= 1
+        if not self._numeric_attributes[trigger.attribute]:
+            del self._numeric_attributes[trigger.attribute]
+        for threshold in trigger.thresholds:
+            del self._crossing_points[
+                bisect_left(self._crossing_points, (threshold, trigger.seq))
+            ]
+
+    @callback
+    def async_dispatch(self, event: Event) -> None:
+        """Hand a state change to the triggers that can match it."""
+        old_state: Optional[State] = event.data.get("old_state")
+        new_state: Optional[State] = event.data.get("new_state")
+        candidates: Dict[int, _Trigger] = {}
+
+        if self._state_any_to_state:
+            candidates.update(self._state_any_to_state)
+        if new_state is not None and new_state.state in self._state_by_to_state:
+            candidates.update(self._state_by_to_state[new_state.state])
+        for attribute, triggers in self._state_by_attribute.items():
+            if _attribute(old_state, attribute) != _attribute(new_state, attribute):
+                candidates.update(triggers)
+
+        if self._numeric:
+            self._async_add_numeric_candidates(candidates, old_state, new_state)
+        if self._numeric_dynamic:
+            candidates.update(self._numeric_dynamic)
+
+        # Call the triggers in the order they were attached
+        for seq in sorted(candidates):
+            settled = candidates[seq].listener(event) is not False
+            numeric = self._numeric.get(seq)
+            if numeric is None:
+                continue
+            if settled:
+                self._numeric_unsettled.pop(seq, None)
+            else:
+                self._numeric_unsettled[seq] = numeric
+
+    def _async_add_numeric_candidates(
+        self,
+        candidates: Dict[int, _Trigger],
+        old_state: Optional[State],
+        new_state: Optional[State],
+    ) -> None:
+        """Add the fixed numeric triggers whose match can have changed."""
+        candidates.update(self._numeric_unsettled)
+
+        # Triggers reading different attributes share the crossing points,
+        # the values of all attributes span the range to check
+        values = []
+        for attribute in self._numeric_attributes:
+            old_value = _numeric_value(old_state, attribute)
+            new_value = _numeric_value(new_state, attribute)
+            if old_value is None or new_value is None:
+                # A value that is not numeric can change any match
+                candidates.update(self._numeric)
+                return
+            values += (old_value, new_value)
+
+        crossing_points = self._crossing_points
+        start = bisect_left(crossing_points, (min(values), -1))
+        end = bisect_right(crossing_points, (max(values), float("inf")))
+        for _, seq in crossing_points[start:end]:
+            candidates[seq] = self._numeric[seq]
+
+
+class StateTriggerEngine:
+    """Dispatch state changes to the triggers of each entity.
+
+    Listens once per entity instead of once per trigger.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the engine."""
+        self.hass = hass
+        self._entities: Dict[str, EntityTriggers] = {}
+        self._unsub_entities: Dict[str, CALLBACK_TYPE] = {}
+        self._seq = count()
+
+    @callback
+    def async_attach_state_trigger(
+        self,
+        entity_ids: Iterable[str],
+        listener: TriggerListener,
+        to_state: Union[None, str, List[Any]],
+        attribute: Optional[str],
+    ) -> CALLBACK_TYPE:
+        """Attach a state trigger, return a function to detach it."""
+        to_states = None
+        if attribute is None and to_state is not None and to_state != MATCH_ALL:
+            to_states = frozenset([to_state] if isinstance(to_state, str) else to_state)
+        return self._async_attach(
+            entity_ids,
+            _StateTrigger(next(self._seq), listener, attribute, to_states),
+        )
+
+    @callback
+    def async_attach_numeric_state_trigger(
+        self,
+        entity_ids: Iterable[str],
+        listener: TriggerListener,
+        below: Union[None, float, str],
+        above: Union[None, float, str],
+        value_template: Optional[Template],
+        attribute: Optional[str],
+    ) -> CALLBACK_TYPE:
+        """Attach a numeric_state trigger, return a function to detach it.
+
+        The listener returns False when it has to check the next change of
+        the entity, even if the value crossed none of its thresholds.
+        """
+        thresholds: Optional[Tuple[float, ...]] = None
+        if (
+            value_template is None
+            and not isinstance(below, str)
+            and not isinstance(above, str)
+        ):
+            thresholds = tuple(
+                threshold for threshold in (below, above) if threshold is not None
+            )
+        return self._async_attach(
+            entity_ids,
+            _NumericStateTrigger(next(self._seq), listener, attribute, thresholds),
+        )
+
+    @callback
+    def _async_attach(
+        self, entity_ids: Iterable[str], trigger: _Trigger
+    ) -> CALLBACK_TYPE:
+        """Add a trigger to the tables of its entities."""
+        entity_ids = [entity_id.lower() for entity_id in entity_ids]
+        for entity_id in entity_ids:
+            entity_triggers = self._entities.get(entity_id)
+            if entity_triggers is None:
+                entity_triggers = self._entities[entity_id] = EntityTriggers()
+                self._unsub_entities[entity_id] = async_track_state_change_event(
+                    self.hass, entity_id, entity_triggers.async_dispatch
+                )
+            entity_triggers.async_add(trigger)
+
+        @callback
+        def async_detach() -> None:
+            """Remove the trigger from the tables of its entities."""
+            for entity_id in entity_ids:
+                entity_triggers = self._entities[entity_id]
+                entity_triggers.async_remove(trigger)
+                if not entity_triggers.count:
+                    del self._entities[entity_id]
+                    self._unsub_entities.pop(entity_id)()
+
+        return async_detach
+
+
+@callback
+def async_get_engine(hass: HomeAssistant) -> StateTriggerEngine:
+    """Return the state trigger engine."""
+    engine: Optional[StateTriggerEngine] = hass.data.get(DATA_STATE_TRIGGER_ENGINE)
+    if engine is None:
+        engine = hass.data[DATA_STATE_TRIGGER_ENGINE] = StateTriggerEngine(hass)
+    return engine
+
+
+def _remove_from_table(table: Dict[Any, Dict[int, Any]], key: Any, seq: int) -> None:
+    """Remove a trigger from a table of triggers by key."""
+    triggers = table[key]
+    del triggers[seq]
+    if not triggers:
+        del table[key]
+
+
+def _attribute(state: Optional[State], attribute: str) -> Any:
+    """Return an attribute of a state, None if there is no state."""
+    if state is None:
+        return None
+    return state.attributes.get(attribute)
+
+
+def _numeric_value(state: Optional[State], attribute: Optional[str]) -> Optional[float]:
+    """Return the numeric value of a state, None if it has none."""
+    if state is None:
+        return None
+    if attribute is None:
+        value: Any = state.state
+    elif attribute in state.attributes:
+        value = state.attributes[attribute]
+    else:
+        return None
+    if value in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        return None
+    try:
+        fvalue = float(value)
+    except (TypeError, ValueError):
+        return None
+    # NaN compares false to any threshold
+    if math.isnan(fvalue):
+        return None
+    return fvalue
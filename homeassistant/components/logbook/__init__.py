@@ -1,9 +1,11 @@
 """Event parser and human readable log generator."""
+from collections import OrderedDict
 from datetime import timedelta
 from itertools import groupby
 import json
 import re
 
+from aiohttp import web
 import sqlalchemy
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql.expression import literal
@@ -14,6 +16,7 @@ from homeassistant.components.history import sqlalchemy_filter_from_include_excl
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder.models import (
     Events,
+    StateAttributes,
     States,
     process_timestamp_to_utc_isoformat,
 )
@@ -26,6 +29,7 @@ from homeassistant.const import (
     ATTR_ICON,
     ATTR_NAME,
     ATTR_SERVICE,
+    CONTENT_TYPE_JSON,
     EVENT_CALL_SERVICE,
     EVENT_HOMEASSISTANT_START,
     EVENT_HOMEASSISTANT_STOP,
@@ -44,6 +48,7 @@ from homeassistant.helpers.entityfilter import (
 from homeassistant.helpers.integration_platform import (
     async_process_integration_platforms,
 )
+from homeassistant.helpers.json import JSONEncoder
 from homeassistant.loader import bind_hass
 import homeassistant.util.dt as dt_util
 
@@ -62,6 +67,14 @@ DOMAIN = "logbook"
 
 GROUP_BY_MINUTES = 15
 
+# The logbook is fetched and sent in pages of this period, aligned to
+# whole hours so the groups of GROUP_BY_MINUTES never span two pages
+PAGE_PERIOD = timedelta(hours=1)
+
+# Number of contexts to keep the first event of, contexts that were
+# dropped are looked up in the database when needed
+CONTEXT_LOOKUP_SIZE = 2048
+
 EMPTY_JSON_OBJECT = "{}"
 UNIT_OF_MEASUREMENT_JSON = '"unit_of_measurement":'
 
@@ -96,6 +109,11 @@ EVENT_COLUMNS = [
     Events.context_parent_id,
 ]
 
+# States written before attributes were deduplicated store them inline
+STATE_ATTRIBUTES = sqlalchemy.func.coalesce(
+    States.attributes, StateAttributes.shared_attrs
+)
+
 SCRIPT_AUTOMATION_EVENTS = [EVENT_AUTOMATION_TRIGGERED, EVENT_SCRIPT_STARTED]
 
 LOG_MESSAGE_SCHEMA = vol.Schema(
@@ -234,21 +252,53 @@ class LogbookView(HomeAssistantView):
 
         entity_matches_only = "entity_matches_only" in request.query
 
-        def json_events():
-            """Fetch events and generate JSON."""
-            return self.json(
-                _get_events(
-                    hass,
-                    start_day,
-                    end_day,
-                    entity_ids,
-                    self.filters,
-                    self.entities_filter,
-                    entity_matches_only,
-                )
+        context_lookup = ContextLookup(start_day)
+
+        def json_page(page_start, page_end):
+            """Fetch the events of a page and generate JSON."""
+            events = _get_events(
+                hass,
+                page_start,
+                page_end,
+                entity_ids,
+                self.filters,
+                self.entities_filter,
+                entity_matches_only,
+                context_lookup,
+            )
+            if not events:
+                return None
+            # Strip the brackets, the pages are joined into one list
+            return json.dumps(events, cls=JSONEncoder, allow_nan=False)[1:-1].encode(
+                "UTF-8"
             )
 
-        return await hass.async_add_executor_job(json_events)
+        response = web.StreamResponse(headers={"Content-Type": CONTENT_TYPE_JSON})
+        await response.prepare(request)
+        await response.write(b"[")
+        separator = b""
+        for page_start, page_end in _pages(start_day, end_day):
+            page = await hass.async_add_executor_job(json_page, page_start, page_end)
+            if page is None:
+                continue
+            await response.write(separator + page)
+            separator = b", "
+        await response.write(b"]")
+        await response.write_eof()
+        return response
+
+
+def _pages(start_day, end_day):
+    """Split the period start_day - end_day in pages of at most PAGE_PERIOD."""
+    page_start = dt_util.as_utc(start_day)
+    end_day = dt_util.as_utc(end_day)
+    while page_start < end_day:
+        page_end = min(
+            page_start.replace(minute=0, second=0, microsecond=0) + PAGE_PERIOD,
+            end_day,
+        )
+        yield page_start, page_end
+        page_start = page_end
 
 
 def humanify(hass, events, entity_attr_cache, context_lookup):
@@ -415,17 +465,25 @@ def _get_events(
     filters=None,
     entities_filter=None,
     entity_matches_only=False,
+    context_lookup=None,
 ):
-    """Get events for a period of time."""
+    """Get events for a period of time.
+
+    Pass the context_lookup of the previous page to get the events of
+    the next page of a longer period.
+    """
 
     entity_attr_cache = EntityAttributeCache(hass)
-    context_lookup = {None: None}
+    if context_lookup is None:
+        context_lookup = ContextLookup(start_day)
+    else:
+        context_lookup.prune()
 
     def yield_events(query):
         """Yield Events that are not filtered away."""
         for row in query.yield_per(1000):
             event = LazyEventPartialState(row)
-            context_lookup.setdefault(event.context_id, event)
+            context_lookup.add(event)
             if event.event_type == EVENT_CALL_SERVICE:
                 continue
             if event.event_type == EVENT_STATE_CHANGED or _keep_event(
@@ -437,43 +495,87 @@ def _get_events(
         entities_filter = generate_filter([], entity_ids, [], [])
 
     with session_scope(hass=hass) as session:
-        old_state = aliased(States, name="old_state")
 
-        if entity_ids is not None:
-            query = _generate_events_query_without_states(session)
-            query = _apply_event_time_filter(query, start_day, end_day)
-            query = _apply_event_types_filter(
-                hass, query, ALL_EVENT_TYPES_EXCEPT_STATE_CHANGED
-            )
-            if entity_matches_only:
-                # When entity_matches_only is provided, contexts and events that do not
-                # contain the entity_ids are not included in the logbook response.
-                query = _apply_event_entity_id_matchers(query, entity_ids)
-
-            query = query.union_all(
-                _generate_states_query(
-                    session, start_day, end_day, old_state, entity_ids
+        def fetch_context(context_id):
+            """Fetch the first event of a context in the previous pages."""
+            row = (
+                _generate_logbook_query(
+                    hass,
+                    session,
+                    context_lookup.start_day,
+                    start_day,
+                    entity_ids,
+                    filters,
+                    entity_matches_only,
                 )
+                .filter(Events.context_id == context_id)
+                .order_by(Events.time_fired)
+                .first()
             )
-        else:
-            query = _generate_events_query(session)
-            query = _apply_event_time_filter(query, start_day, end_day)
-            query = _apply_events_types_and_states_filter(
-                hass, query, old_state
-            ).filter(
-                (States.last_updated == States.last_changed)
-                | (Events.event_type != EVENT_STATE_CHANGED)
+            return row and LazyEventPartialState(row)
+
+        query = _generate_logbook_query(
+            hass,
+            session,
+            start_day,
+            end_day,
+            entity_ids,
+            filters,
+            entity_matches_only,
+            # Later pages start where the previous page ended
+            start_inclusive=dt_util.as_utc(start_day) > context_lookup.start_day,
+        ).order_by(Events.time_fired)
+
+        context_lookup.fetch = fetch_context
+        try:
+            return list(
+                humanify(hass, yield_events(query), entity_attr_cache, context_lookup)
             )
-            if filters:
-                query = query.filter(
-                    filters.entity_filter() | (Events.event_type != EVENT_STATE_CHANGED)
-                )
+        finally:
+            context_lookup.fetch = None
 
-        query = query.order_by(Events.time_fired)
 
-        return list(
-            humanify(hass, yield_events(query), entity_attr_cache, context_lookup)
+def _generate_logbook_query(
+    hass,
+    session,
+    start_day,
+    end_day,
+    entity_ids,
+    filters,
+    entity_matches_only,
+    start_inclusive=False,
+):
+    """Generate the query of the logbook rows of a period."""
+    old_state = aliased(States, name="old_state")
+
+    if entity_ids is not None:
+        query = _generate_events_query_without_states(session)
+        query = _apply_event_time_filter(query, start_day, end_day, start_inclusive)
+        query = _apply_event_types_filter(
+            hass, query, ALL_EVENT_TYPES_EXCEPT_STATE_CHANGED
+        )
+        if entity_matches_only:
+            # When entity_matches_only is provided, contexts and events that do not
+            # contain the entity_ids are not included in the logbook response.
+            query = _apply_event_entity_id_matchers(query, entity_ids)
+
+        return query.union_all(
+            _generate_states_query(
+                session, start_day, end_day, old_state, entity_ids, start_inclusive
+            )
+        )
+
+    query = _generate_events_query(session)
+    query = _apply_event_time_filter(query, start_day, end_day, start_inclusive)
+    query = _apply_events_types_and_states_filter(hass, query, old_state).filter(
+        (States.last_updated == States.last_changed)
+        | (Events.event_type != EVENT_STATE_CHANGED)
+    )
+    if filters:
+        query = query.filter(
+            filters.entity_filter() | (Events.event_type != EVENT_STATE_CHANGED)
         )
+    return query
 
 
 def _generate_events_query(session):
@@ -482,7 +584,13 @@ def _generate_events_query(session):
         States.state,
         States.entity_id,
         States.domain,
-        States.attributes,
+        STATE_ATTRIBUTES.label("attributes"),
+    )
+
+
+def _outerjoin_state_attributes(query):
+    return query.outerjoin(
+        StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
     )
 
 
@@ -496,14 +604,22 @@ def _generate_events_query_without_states(session):
     )
 
 
-def _generate_states_query(session, start_day, end_day, old_state, entity_ids):
+def _generate_states_query(
+    session, start_day, end_day, old_state, entity_ids, start_inclusive
+):
+    if start_inclusive:
+        after_start = States.last_updated >= start_day
+    else:
+        after_start = States.last_updated > start_day
     return (
-        _generate_events_query(session)
-        .outerjoin(Events, (States.event_id == Events.event_id))
-        .outerjoin(old_state, (States.old_state_id == old_state.state_id))
+        _outerjoin_state_attributes(
+            _generate_events_query(session)
+            .outerjoin(Events, (States.event_id == Events.event_id))
+            .outerjoin(old_state, (States.old_state_id == old_state.state_id))
+        )
         .filter(_missing_state_matcher(old_state))
         .filter(_continuous_entity_matcher())
-        .filter((States.last_updated > start_day) & (States.last_updated < end_day))
+        .filter(after_start & (States.last_updated < end_day))
         .filter(
             (States.last_updated == States.last_changed)
             & States.entity_id.in_(entity_ids)
@@ -513,8 +629,11 @@ def _generate_states_query(session, start_day, end_day, old_state, entity_ids):
 
 def _apply_events_types_and_states_filter(hass, query, old_state):
     events_query = (
-        query.outerjoin(States, (Events.event_id == States.event_id))
-        .outerjoin(old_state, (States.old_state_id == old_state.state_id))
+        _outerjoin_state_attributes(
+            query.outerjoin(States, (Events.event_id == States.event_id)).outerjoin(
+                old_state, (States.old_state_id == old_state.state_id)
+            )
+        )
         .filter(
             (Events.event_type != EVENT_STATE_CHANGED)
             | _missing_state_matcher(old_state)
@@ -544,14 +663,16 @@ def _continuous_entity_matcher():
     #
     return sqlalchemy.or_(
         sqlalchemy.not_(States.domain.in_(CONTINUOUS_DOMAINS)),
-        sqlalchemy.not_(States.attributes.contains(UNIT_OF_MEASUREMENT_JSON)),
+        sqlalchemy.not_(STATE_ATTRIBUTES.contains(UNIT_OF_MEASUREMENT_JSON)),
     )
 
 
-def _apply_event_time_filter(events_query, start_day, end_day):
-    return events_query.filter(
-        (Events.time_fired > start_day) & (Events.time_fired < end_day)
-    )
+def _apply_event_time_filter(events_query, start_day, end_day, start_inclusive):
+    if start_inclusive:
+        after_start = Events.time_fired >= start_day
+    else:
+        after_start = Events.time_fired > start_day
+    return events_query.filter(after_start & (Events.time_fired < end_day))
 
 
 def _apply_event_types_filter(hass, query, event_types):
@@ -759,6 +880,45 @@ class LazyEventPartialState:
         return self._time_fired_isoformat
 
 
+class ContextLookup:
+    """A lookup of the first event of each context since start_day.
+
+    Between pages only the first events of the last CONTEXT_LOOKUP_SIZE
+    contexts are kept. Once contexts were dropped, contexts that are not
+    kept are looked up in the previous pages with fetch.
+    """
+
+    def __init__(self, start_day):
+        """Init the lookup."""
+        self.start_day = dt_util.as_utc(start_day)
+        self.fetch = None
+        self._events = OrderedDict()
+        self._dropped = False
+
+    def add(self, event):
+        """Add an event, it is kept if it is the first of its context."""
+        context_id = event.context_id
+        if self._events.get(context_id) is None:
+            self._events[context_id] = event
+
+    def get(self, context_id):
+        """Return the first event of a context."""
+        if context_id is None:
+            return None
+        if context_id in self._events:
+            return self._events[context_id]
+        if not self._dropped or self.fetch is None:
+            return None
+        event = self._events[context_id] = self.fetch(context_id)
+        return event
+
+    def prune(self):
+        """Drop the oldest contexts, called before the next page."""
+        while len(self._events) > CONTEXT_LOOKUP_SIZE:
+            self._events.popitem(last=False)
+            self._dropped = True
+
+
 class EntityAttributeCache:
     """A cache to lookup static entity_id attribute.
 
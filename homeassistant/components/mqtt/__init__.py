@@ -1,6 +1,7 @@
 """Support for MQTT message handling."""
 import asyncio
-from functools import lru_cache, partial, wraps
+from collections import deque
+from functools import partial, wraps
 import inspect
 from itertools import groupby
 import logging
@@ -8,7 +9,7 @@ from operator import attrgetter
 import os
 import ssl
 import time
-from typing import Any, Callable, List, Optional, Union
+from typing import Any, Callable, Deque, Dict, List, Optional, Union
 import uuid
 
 import attr
@@ -67,7 +68,12 @@ from .const import (
     PROTOCOL_311,
 )
 from .discovery import LAST_DISCOVERY
-from .models import Message, MessageCallbackType, PublishPayloadType
+from .models import (
+    Message,
+    MessageCallbackType,
+    PublishPayloadType,
+    SubscriptionTrie,
+)
 from .util import _VALID_QOS_SCHEMA, valid_publish_topic, valid_subscribe_topic
 
 _LOGGER = logging.getLogger(__name__)
@@ -531,7 +537,6 @@ class Subscription:
     """Class to hold data about an active subscription."""
 
     topic: str = attr.ib()
-    matcher: Any = attr.ib()
     job: HassJob = attr.ib()
     qos: int = attr.ib(default=0)
     encoding: str = attr.ib(default="utf-8")
@@ -555,6 +560,7 @@ class MQTT:
         self.config_entry = config_entry
         self.conf = conf
         self.subscriptions: List[Subscription] = []
+        self._subscription_trie = SubscriptionTrie()
         self.connected = False
         self._ha_started = asyncio.Event()
         self._last_subscribe = time.time()
@@ -562,6 +568,9 @@ class MQTT:
         self._paho_lock = asyncio.Lock()
 
         self._pending_operations = {}
+        # Messages received by the paho thread, waiting to be handled
+        self._pending_messages: Deque[Any] = deque()
+        self._handle_messages_scheduled = False
 
         if self.hass.state == CoreState.running:
             self._ha_started.set()
@@ -741,11 +750,9 @@ class MQTT:
         if not isinstance(topic, str):
             raise HomeAssistantError("Topic needs to be a string!")
 
-        subscription = Subscription(
-            topic, _matcher_for_topic(topic), HassJob(msg_callback), qos, encoding
-        )
+        subscription = Subscription(topic, HassJob(msg_callback), qos, encoding)
         self.subscriptions.append(subscription)
-        self._matching_subscriptions.cache_clear()
+        self._subscription_trie.add(topic, subscription)
 
         # Only subscribe if currently connected.
         if self.connected:
@@ -758,9 +765,9 @@ class MQTT:
             if subscription not in self.subscriptions:
                 raise HomeAssistantError("Can't remove subscription twice")
             self.subscriptions.remove(subscription)
-            self._matching_subscriptions.cache_clear()
+            self._subscription_trie.remove(topic, subscription)
 
-            if any(other.topic == topic for other in self.subscriptions):
+            if self._subscription_trie.has_values(topic):
                 # Other subscriptions on topic remaining - don't unsubscribe.
                 return
 
@@ -848,16 +855,24 @@ class MQTT:
             )
 
     def _mqtt_on_message(self, _mqttc, _userdata, msg) -> None:
-        """Message received callback."""
-        self.hass.add_job(self._mqtt_handle_message, msg)
+        """Message received callback.
 
-    @lru_cache(2048)
-    def _matching_subscriptions(self, topic):
-        subscriptions = []
-        for subscription in self.subscriptions:
-            if subscription.matcher(topic):
-                subscriptions.append(subscription)
-        return subscriptions
+        Messages are buffered and handled in batches, a burst of messages
+        only wakes up the event loop once.
+        """
+        self._pending_messages.append(msg)
+        if not self._handle_messages_scheduled:
+            self._handle_messages_scheduled = True
+            self.hass.loop.call_soon_threadsafe(self._mqtt_handle_messages)
+
+    @callback
+    def _mqtt_handle_messages(self) -> None:
+        """Handle the buffered messages."""
+        # Messages appended from now on schedule another run
+        self._handle_messages_scheduled = False
+        pending_messages = self._pending_messages
+        while pending_messages:
+            self._mqtt_handle_message(pending_messages.popleft())
 
     @callback
     def _mqtt_handle_message(self, msg) -> None:
@@ -869,20 +884,28 @@ class MQTT:
         )
         timestamp = dt_util.utcnow()
 
-        subscriptions = self._matching_subscriptions(msg.topic)
+        subscriptions = self._subscription_trie.match(msg.topic)
+        # The payload is decoded once per encoding, None if it failed
+        decoded_payloads: Dict[str, Optional[str]] = {}
 
         for subscription in subscriptions:
 
             payload: SubscribePayloadType = msg.payload
-            if subscription.encoding is not None:
-                try:
-                    payload = msg.payload.decode(subscription.encoding)
-                except (AttributeError, UnicodeDecodeError):
+            encoding = subscription.encoding
+            if encoding is not None:
+                if encoding not in decoded_payloads:
+                    try:
+                        decoded_payloads[encoding] = msg.payload.decode(encoding)
+                    except (AttributeError, UnicodeDecodeError):
+                        decoded_payloads[encoding] = None
+
+                payload = decoded_payloads[encoding]
+                if payload is None:
                     _LOGGER.warning(
                         "Can't decode payload %s on %s with encoding %s (for %s)",
                         msg.payload[0:8192],
                         msg.topic,
-                        subscription.encoding,
+                        encoding,
                         subscription.job,
                     )
                     continue
@@ -967,16 +990,6 @@ def _raise_on_error(result_code: int) -> None:
         )
 
 
-def _matcher_for_topic(subscription: str) -> Any:
-    # pylint: disable=import-outside-toplevel
-    from paho.mqtt.matcher import MQTTMatcher
-
-    matcher = MQTTMatcher()
-    matcher[subscription] = True
-
-    return lambda topic: next(matcher.iter_match(topic), False)
-
-
 @websocket_api.websocket_command(
     {vol.Required("type"): "mqtt/device/debug_info", vol.Required("device_id"): str}
 )
@@ -1,6 +1,8 @@
 """Modesl used by multiple MQTT modules."""
 import datetime as dt
-from typing import Callable, Optional, Union
+from itertools import count
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import attr
 
@@ -20,3 +22,103 @@ class Message:
 
 
 MessageCallbackType = Callable[[Message], None]
+
+
+class _TopicNode:
+    """Node of a SubscriptionTrie, one level of a topic filter."""
+
+    __slots__ = ("children", "values")
+
+    def __init__(self) -> None:
+        """Initialize the node."""
+        self.children: Dict[str, "_TopicNode"] = {}
+        self.values: List[Tuple[int, Any]] = []
+
+
+class SubscriptionTrie:
+    """Prefix tree of MQTT topic filters, supporting the + and # wildcards.
+
+    Values are added and removed per topic filter without touching the rest
+    of the tree. match() returns the values of all filters matching a topic
+    in the order they were added.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the trie."""
+        self._root = _TopicNode()
+        self._sequence = count()
+
+    def add(self, topic_filter: str, value: Any) -> None:
+        """Add a value for a topic filter."""
+        node = self._root
+        for level in topic_filter.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _TopicNode()
+            node = child
+        node.values.append((next(self._sequence), value))
+
+    def remove(self, topic_filter: str, value: Any) -> None:
+        """Remove a value of a topic filter, raise ValueError if not present."""
+        path = []
+        node = self._root
+        for level in topic_filter.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                raise ValueError(f"{topic_filter} is not in the trie")
+            path.append((node, level, child))
+            node = child
+
+        for index, (_, item) in enumerate(node.values):
+            if item is value:
+                del node.values[index]
+                break
+        else:
+            raise ValueError(f"{value} is not in the trie for {topic_filter}")
+
+        # Prune the nodes that no longer lead to a value
+        for parent, level, child in reversed(path):
+            if child.children or child.values:
+                break
+            del parent.children[level]
+
+    def has_values(self, topic_filter: str) -> bool:
+        """Return if the topic filter itself has values."""
+        node = self._root
+        for level in topic_filter.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                return False
+            node = child
+        return bool(node.values)
+
+    def match(self, topic: str) -> List[Any]:
+        """Return the values of all topic filters matching a topic."""
+        levels = topic.split("/")
+        depth = len(levels)
+        # Wildcards do not match the first level of topics starting with $
+        wildcards_on_first_level = not topic.startswith("$")
+        matches: List[Tuple[int, Any]] = []
+        stack = [(self._root, 0)]
+        while stack:
+            node, index = stack.pop()
+            children = node.children
+            wildcards = index > 0 or wildcards_on_first_level
+
+            # A multi-level wildcard also matches its parent level
+            if wildcards and "#" in children:
+                matches.extend(children["#"].values)
+
+            if index == depth:
+                matches.extend(node.values)
+                continue
+
+            child = children.get(levels[index])
+            if child is not None:
+                stack.append((child, index + 1))
+            if wildcards and "+" in children:
+                stack.append((children["+"], index + 1))
+
+        if len(matches) > 1:
+            matches.sort(key=itemgetter(0))
+        return [value for _, value in matches]
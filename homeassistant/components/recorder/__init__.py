@@ -1,15 +1,15 @@
 """Support for recording details."""
 import asyncio
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 import concurrent.futures
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 import queue
 import threading
 import time
-from typing import Any, Callable, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
-from sqlalchemy import create_engine, event as sqlalchemy_event, exc, select
+from sqlalchemy import create_engine, event as sqlalchemy_event, exc, func, select
 from sqlalchemy.orm import scoped_session, sessionmaker
 from sqlalchemy.pool import StaticPool
 import voluptuous as vol
@@ -21,7 +21,6 @@ from homeassistant.const import (
     EVENT_HOMEASSISTANT_START,
     EVENT_HOMEASSISTANT_STOP,
     EVENT_STATE_CHANGED,
-    EVENT_TIME_CHANGED,
     MATCH_ALL,
 )
 from homeassistant.core import CoreState, HomeAssistant, callback
@@ -34,9 +33,9 @@ from homeassistant.helpers.entityfilter import (
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.util.dt as dt_util
 
-from . import migration, purge
+from . import migration, purge, statistics
 from .const import CONF_DB_INTEGRITY_CHECK, DATA_INSTANCE, DOMAIN, SQLITE_URL_PREFIX
-from .models import Base, Events, RecorderRuns, States
+from .models import Base, Events, RecorderRuns, StateAttributes, States
 from .util import session_scope, validate_or_move_away_sqlite_database
 
 _LOGGER = logging.getLogger(__name__)
@@ -61,9 +60,9 @@ DEFAULT_DB_RETRY_WAIT = 3
 DEFAULT_COMMIT_INTERVAL = 1
 KEEPALIVE_TIME = 30
 
-# Controls how often we clean up
-# States and Events objects
-EXPIRE_AFTER_COMMITS = 120
+# Number of recently used serialized attributes to keep the
+# state_attributes row id of
+STATE_ATTRIBUTES_CACHE_SIZE = 2048
 
 CONF_AUTO_PURGE = "auto_purge"
 CONF_DB_URL = "db_url"
@@ -198,11 +197,21 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
 
 PurgeTask = namedtuple("PurgeTask", ["keep_days", "repack"])
 
+StatisticsTask = namedtuple("StatisticsTask", ["start"])
+
 
 class WaitTask:
     """An object to insert into the recorder queue to tell it set the _queue_watch event."""
 
 
+class CommitTask:
+    """An object to insert into the recorder queue to commit the event session."""
+
+
+class KeepAliveTask:
+    """An object to insert into the recorder queue to keep the connection alive."""
+
+
 class Recorder(threading.Thread):
     """A threaded recorder class."""
 
@@ -240,11 +249,19 @@ class Recorder(threading.Thread):
         self.entity_filter = entity_filter
         self.exclude_t = exclude_t
 
-        self._timechanges_seen = 0
-        self._commits_without_expire = 0
-        self._keepalive_count = 0
-        self._old_states = {}
-        self._pending_expunge = []
+        self._periodic_listeners: List[Callable[[], None]] = []
+        # Event and state rows waiting for the next commit
+        self._pending_rows: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = []
+        # The state_id of the last recorded state of each entity
+        self._old_state_ids: Dict[str, int] = {}
+        # LRU of serialized attributes to their state_attributes row id
+        self._state_attributes_ids: "OrderedDict[str, int]" = OrderedDict()
+        self.rows_written = 0
+        self.rows_per_second = 0.0
+        # Progress of the running purge
+        self.purge_batches = 0
+        self.purged_states = 0
+        self.purged_events = 0
         self.event_session = None
         self.get_session = None
         self._completed_database_setup = False
@@ -310,6 +327,8 @@ class Recorder(threading.Thread):
                 """Shut down the Recorder."""
                 if not hass_started.done():
                     hass_started.set_result(shutdown_task)
+                for remove_listener in self._periodic_listeners:
+                    remove_listener()
                 self.queue.put(None)
                 self.join()
 
@@ -348,11 +367,47 @@ class Recorder(threading.Thread):
                 async_purge, hour=4, minute=12, second=0
             )
 
+        @callback
+        def async_periodic_statistics(now):
+            """Trigger the hourly compile of statistics."""
+            self.queue.put(StatisticsTask(statistics.get_start_time()))
+
+        # Compile the statistics of the last hour every hour
+        self.hass.helpers.event.track_time_change(
+            async_periodic_statistics, minute=12, second=0
+        )
+
+        # Commit and keep the connection alive on their own timers
+        # instead of counting time changed events.
+        if self.commit_interval:
+
+            @callback
+            def async_commit(now):
+                """Trigger a commit of the event session."""
+                self.queue.put(CommitTask())
+
+            self._periodic_listeners.append(
+                self.hass.helpers.event.track_time_interval(
+                    async_commit, timedelta(seconds=self.commit_interval)
+                )
+            )
+
+        @callback
+        def async_keep_alive(now):
+            """Trigger a keep alive of the database connection."""
+            self.queue.put(KeepAliveTask())
+
+        self._periodic_listeners.append(
+            self.hass.helpers.event.track_time_interval(
+                async_keep_alive, timedelta(seconds=KEEPALIVE_TIME)
+            )
+        )
+
         self.event_session = self.get_session()
         self.event_session.expire_on_commit = False
-        # Use a session for the event read loop
-        # with a commit every time the event time
-        # has changed. This reduces the disk io.
+        # Buffer the rows of the event read loop and
+        # write them in bulk every commit_interval
+        # seconds. This reduces the disk io.
         while True:
             event = self.queue.get()
             if event is None:
@@ -364,19 +419,17 @@ class Recorder(threading.Thread):
                 if not purge.purge_old_data(self, event.keep_days, event.repack):
                     self.queue.put(PurgeTask(event.keep_days, event.repack))
                 continue
+            if isinstance(event, StatisticsTask):
+                statistics.compile_statistics(self, event.start)
+                continue
             if isinstance(event, WaitTask):
                 self._queue_watch.set()
                 continue
-            if event.event_type == EVENT_TIME_CHANGED:
-                self._keepalive_count += 1
-                if self._keepalive_count >= KEEPALIVE_TIME:
-                    self._keepalive_count = 0
-                    self._send_keep_alive()
-                if self.commit_interval:
-                    self._timechanges_seen += 1
-                    if self._timechanges_seen >= self.commit_interval:
-                        self._timechanges_seen = 0
-                        self._commit_event_session_or_retry()
+            if isinstance(event, CommitTask):
+                self._commit_event_session_or_retry()
+                continue
+            if isinstance(event, KeepAliveTask):
+                self._send_keep_alive()
                 continue
             if event.event_type in self.exclude_t:
                 continue
@@ -388,35 +441,25 @@ class Recorder(threading.Thread):
 
             try:
                 if event.event_type == EVENT_STATE_CHANGED:
-                    dbevent = Events.from_event(event, event_data="{}")
+                    event_row = Events.row_from_event(event, event_data="{}")
                 else:
-                    dbevent = Events.from_event(event)
-                dbevent.created = event.time_fired
-                self.event_session.add(dbevent)
+                    event_row = Events.row_from_event(event)
+                event_row["created"] = event.time_fired
             except (TypeError, ValueError):
                 _LOGGER.warning("Event is not JSON serializable: %s", event)
+                continue
             except Exception as err:  # pylint: disable=broad-except
                 # Must catch the exception to prevent the loop from collapsing
                 _LOGGER.exception("Error adding event: %s", err)
+                continue
 
-            if dbevent and event.event_type == EVENT_STATE_CHANGED:
+            state_row = None
+            if event.event_type == EVENT_STATE_CHANGED:
                 try:
-                    dbstate = States.from_event(event)
-                    has_new_state = event.data.get("new_state")
-                    if dbstate.entity_id in self._old_states:
-                        old_state = self._old_states.pop(dbstate.entity_id)
-                        if old_state.state_id:
-                            dbstate.old_state_id = old_state.state_id
-                        else:
-                            dbstate.old_state = old_state
-                    if not has_new_state:
-                        dbstate.state = None
-                    dbstate.event = dbevent
-                    dbstate.created = event.time_fired
-                    self.event_session.add(dbstate)
-                    if has_new_state:
-                        self._old_states[dbstate.entity_id] = dbstate
-                        self._pending_expunge.append(dbstate)
+                    state_row = States.row_from_event(event)
+                    if not event.data.get("new_state"):
+                        state_row["state"] = None
+                    state_row["created"] = event.time_fired
                 except (TypeError, ValueError):
                     _LOGGER.warning(
                         "State is not JSON serializable: %s",
@@ -426,6 +469,8 @@ class Recorder(threading.Thread):
                     # Must catch the exception to prevent the loop from collapsing
                     _LOGGER.exception("Error adding state change: %s", err)
 
+            self._pending_rows.append((event_row, state_row))
+
             # If they do not have a commit interval
             # than we commit right away
             if not self.commit_interval:
@@ -473,12 +518,14 @@ class Recorder(threading.Thread):
             except Exception as err:  # pylint: disable=broad-except
                 # Must catch the exception to prevent the loop from collapsing
                 _LOGGER.exception("Error saving events: %s", err)
+                self._pending_rows = []
                 return
 
         _LOGGER.error(
             "Error in database update. Could not save " "after %d tries. Giving up",
             tries,
         )
+        self._pending_rows = []
         self._reopen_event_session()
 
     def _reopen_event_session(self):
@@ -502,17 +549,8 @@ class Recorder(threading.Thread):
             _LOGGER.exception("Error while creating new event session: %s", err)
 
     def _commit_event_session(self):
-        self._commits_without_expire += 1
-
         try:
-            if self._pending_expunge:
-                self.event_session.flush()
-                for dbstate in self._pending_expunge:
-                    # Expunge the state so its not expired
-                    # until we use it later for dbstate.old_state
-                    if dbstate in self.event_session:
-                        self.event_session.expunge(dbstate)
-                self._pending_expunge = []
+            old_state_ids, attributes_ids = self._write_pending_rows()
             self.event_session.commit()
         except exc.IntegrityError as err:
             _LOGGER.error(
@@ -520,19 +558,134 @@ class Recorder(threading.Thread):
                 err,
             )
             self.event_session.rollback()
-            self._old_states = {}
+            self._pending_rows = []
+            self._old_state_ids = {}
+            self._state_attributes_ids.clear()
             raise
         except Exception as err:
             _LOGGER.error("Error executing query: %s", err)
             self.event_session.rollback()
             raise
 
-        # Expire is an expensive operation (frequently more expensive
-        # than the flush and commit itself) so we only
-        # do it after EXPIRE_AFTER_COMMITS commits
-        if self._commits_without_expire == EXPIRE_AFTER_COMMITS:
-            self._commits_without_expire = 0
-            self.event_session.expire_all()
+        self._pending_rows = []
+        self._old_state_ids = old_state_ids
+        for shared_attrs, attributes_id in attributes_ids.items():
+            self._state_attributes_ids[shared_attrs] = attributes_id
+            self._state_attributes_ids.move_to_end(shared_attrs)
+        while len(self._state_attributes_ids) > STATE_ATTRIBUTES_CACHE_SIZE:
+            self._state_attributes_ids.popitem(last=False)
+
+    def _write_pending_rows(self):
+        """Insert the pending rows with one bulk insert per table.
+
+        Primary keys are assigned here so the event_id, attributes_id and
+        old_state_id of the state rows can be resolved without reading
+        anything back. Returns the state_id of the last state of each entity
+        and the attributes_id of the attributes used once the rows are
+        written.
+        """
+        old_state_ids = self._old_state_ids
+        if not self._pending_rows:
+            return old_state_ids, {}
+
+        start = time.monotonic()
+        old_state_ids = dict(old_state_ids)
+        attributes_ids = {}
+        session = self.event_session
+        event_id = session.query(func.max(Events.event_id)).scalar() or 0
+        state_id = session.query(func.max(States.state_id)).scalar() or 0
+        attributes_id = None
+        event_rows = []
+        state_rows = []
+        attributes_rows = []
+
+        for event_row, state_row in self._pending_rows:
+            event_id += 1
+            event_rows.append({**event_row, "event_id": event_id})
+            if state_row is None:
+                continue
+
+            shared_attrs = state_row["attributes"]
+            state_attributes_id = self._state_attributes_ids.get(
+                shared_attrs
+            ) or attributes_ids.get(shared_attrs)
+            if state_attributes_id is None:
+                state_attributes_id = self._find_attributes_id(shared_attrs)
+            if state_attributes_id is None:
+                if attributes_id is None:
+                    attributes_id = (
+                        session.query(func.max(StateAttributes.attributes_id)).scalar()
+                        or 0
+                    )
+                attributes_id += 1
+                state_attributes_id = attributes_id
+                attributes_rows.append(
+                    {
+                        "attributes_id": attributes_id,
+                        "hash": StateAttributes.hash_shared_attrs(shared_attrs),
+                        "shared_attrs": shared_attrs,
+                    }
+                )
+            attributes_ids[shared_attrs] = state_attributes_id
+
+            state_id += 1
+            entity_id = state_row["entity_id"]
+            state_rows.append(
+                {
+                    **state_row,
+                    "state_id": state_id,
+                    "event_id": event_id,
+                    "attributes": None,
+                    "attributes_id": state_attributes_id,
+                    "old_state_id": old_state_ids.pop(entity_id, None),
+                }
+            )
+            if state_row["state"] is not None:
+                old_state_ids[entity_id] = state_id
+
+        session.execute(Events.__table__.insert(), event_rows)
+        if attributes_rows:
+            session.execute(StateAttributes.__table__.insert(), attributes_rows)
+        if state_rows:
+            session.execute(States.__table__.insert(), state_rows)
+
+        rows = len(event_rows) + len(attributes_rows) + len(state_rows)
+        elapsed = time.monotonic() - start
+        self.rows_written += rows
+        if elapsed:
+            self.rows_per_second = rows / elapsed
+        _LOGGER.debug(
+            "Wrote %s rows in %.3f seconds (%.0f rows/s), %s items queued",
+            rows,
+            elapsed,
+            self.rows_per_second,
+            self.queue_depth,
+        )
+        return old_state_ids, attributes_ids
+
+    def _find_attributes_id(self, shared_attrs):
+        """Return the id of a stored state_attributes row matching shared_attrs."""
+        for attributes_id, stored_attrs in self.event_session.query(
+            StateAttributes.attributes_id, StateAttributes.shared_attrs
+        ).filter(
+            StateAttributes.hash == StateAttributes.hash_shared_attrs(shared_attrs)
+        ):
+            if stored_attrs == shared_attrs:
+                return attributes_id
+        return None
+
+    def clear_state_attributes_cache(self):
+        """Forget the cached state_attributes row ids.
+
+        Must be called from the recorder thread after rows were removed from
+        the state_attributes table.
+        """
+        self._state_attributes_ids.clear()
+
+    @property
+    def queue_depth(self):
+        """Return the number of items waiting in the recorder queue."""
+        return self.queue.qsize()
 
     @callback
     def event_listener(self, event):
@@ -571,6 +724,9 @@ class Recorder(threading.Thread):
                 old_isolation = dbapi_connection.isolation_level
                 dbapi_connection.isolation_level = None
                 cursor = dbapi_connection.cursor()
+                # New databases release the space of purged rows with
+                # incremental vacuums, existing databases switch on repack
+                cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
                 cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.close()
                 dbapi_connection.isolation_level = old_isolation
@@ -323,6 +323,14 @@ def _apply_update(engine, new_version, old_version):
     elif new_version == 11:
         _create_index(engine, "states", "ix_states_old_state_id")
         _update_states_table_with_foreign_key_options(engine)
+    elif new_version == 12:
+        # The state_attributes table is created by create_all, existing
+        # states keep their inline attributes
+        _add_columns(engine, "states", ["attributes_id INTEGER"])
+        _create_index(engine, "states", "ix_states_attributes_id")
+    elif new_version == 13:
+        # The statistics table is created by create_all
+        pass
     else:
         raise ValueError(f"No schema migration defined for version {new_version}")
 
@@ -1,11 +1,14 @@
 """Models for SQLAlchemy."""
 import json
 import logging
+import zlib
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -25,7 +28,7 @@ import homeassistant.util.dt as dt_util
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 11
+SCHEMA_VERSION = 13
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,10 +36,19 @@ DB_TIMEZONE = "+00:00"
 
 TABLE_EVENTS = "events"
 TABLE_STATES = "states"
+TABLE_STATE_ATTRIBUTES = "state_attributes"
+TABLE_STATISTICS = "statistics"
 TABLE_RECORDER_RUNS = "recorder_runs"
 TABLE_SCHEMA_CHANGES = "schema_changes"
 
-ALL_TABLES = [TABLE_STATES, TABLE_EVENTS, TABLE_RECORDER_RUNS, TABLE_SCHEMA_CHANGES]
+ALL_TABLES = [
+    TABLE_STATES,
+    TABLE_STATE_ATTRIBUTES,
+    TABLE_STATISTICS,
+    TABLE_EVENTS,
+    TABLE_RECORDER_RUNS,
+    TABLE_SCHEMA_CHANGES,
+]
 
 
 class Events(Base):  # type: ignore
@@ -66,15 +78,20 @@ class Events(Base):  # type: ignore
     @staticmethod
     def from_event(event, event_data=None):
         """Create an event database object from a native event."""
-        return Events(
-            event_type=event.event_type,
-            event_data=event_data or json.dumps(event.data, cls=JSONEncoder),
-            origin=str(event.origin.value),
-            time_fired=event.time_fired,
-            context_id=event.context.id,
-            context_user_id=event.context.user_id,
-            context_parent_id=event.context.parent_id,
-        )
+        return Events(**Events.row_from_event(event, event_data))
+
+    @staticmethod
+    def row_from_event(event, event_data=None):
+        """Create the column values of an event row from a native event."""
+        return {
+            "event_type": event.event_type,
+            "event_data": event_data or json.dumps(event.data, cls=JSONEncoder),
+            "origin": str(event.origin.value),
+            "time_fired": event.time_fired,
+            "context_id": event.context.id,
+            "context_user_id": event.context.user_id,
+            "context_parent_id": event.context.parent_id,
+        }
 
     def to_native(self, validate_entity_id=True):
         """Convert to a natve HA Event."""
@@ -110,6 +127,9 @@ class States(Base):  # type: ignore
     entity_id = Column(String(255))
     state = Column(String(255))
     attributes = Column(Text)
+    attributes_id = Column(
+        Integer, ForeignKey("state_attributes.attributes_id"), index=True
+    )
     event_id = Column(
         Integer, ForeignKey("events.event_id", ondelete="CASCADE"), index=True
     )
@@ -121,6 +141,7 @@ class States(Base):  # type: ignore
     )
     event = relationship("Events", uselist=False)
     old_state = relationship("States", remote_side=[state_id])
+    state_attributes = relationship("StateAttributes", lazy="joined")
 
     __table_args__ = (
         # Used for fetching the state of entities at a specific time
@@ -131,26 +152,45 @@ class States(Base):  # type: ignore
     @staticmethod
     def from_event(event):
         """Create object from a state_changed event."""
+        return States(**States.row_from_event(event))
+
+    @staticmethod
+    def row_from_event(event):
+        """Create the column values of a state row from a state_changed event."""
         entity_id = event.data["entity_id"]
         state = event.data.get("new_state")
 
-        dbstate = States(entity_id=entity_id)
-
         # State got deleted
         if state is None:
-            dbstate.state = ""
-            dbstate.domain = split_entity_id(entity_id)[0]
-            dbstate.attributes = "{}"
-            dbstate.last_changed = event.time_fired
-            dbstate.last_updated = event.time_fired
-        else:
-            dbstate.domain = state.domain
-            dbstate.state = state.state
-            dbstate.attributes = json.dumps(dict(state.attributes), cls=JSONEncoder)
-            dbstate.last_changed = state.last_changed
-            dbstate.last_updated = state.last_updated
-
-        return dbstate
+            return {
+                "entity_id": entity_id,
+                "domain": split_entity_id(entity_id)[0],
+                "state": "",
+                "attributes": "{}",
+                "last_changed": event.time_fired,
+                "last_updated": event.time_fired,
+            }
+
+        return {
+            "entity_id": entity_id,
+            "domain": state.domain,
+            "state": state.state,
+            "attributes": json.dumps(dict(state.attributes), cls=JSONEncoder),
+            "last_changed": state.last_changed,
+            "last_updated": state.last_updated,
+        }
+
+    @property
+    def shared_attrs(self):
+        """Return the serialized attributes of the state.
+
+        States written before attributes were deduplicated store them inline.
+        """
+        if self.attributes is not None:
+            return self.attributes
+        if self.state_attributes is not None:
+            return self.state_attributes.shared_attrs
+        return "{}"
 
     def to_native(self, validate_entity_id=True):
         """Convert to an HA state object."""
@@ -158,7 +198,7 @@ class States(Base):  # type: ignore
             return State(
                 self.entity_id,
                 self.state,
-                json.loads(self.attributes),
+                json.loads(self.shared_attrs),
                 process_timestamp(self.last_changed),
                 process_timestamp(self.last_updated),
                 # Join the events table on event_id to get the context instead
@@ -172,6 +212,53 @@ class States(Base):  # type: ignore
             return None
 
 
+class StateAttributes(Base):  # type: ignore
+    """Serialized state attributes shared between state rows."""
+
+    __table_args__ = {
+        "mysql_default_charset": "utf8mb4",
+        "mysql_collate": "utf8mb4_unicode_ci",
+    }
+    __tablename__ = TABLE_STATE_ATTRIBUTES
+    attributes_id = Column(Integer, primary_key=True)
+    hash = Column(BigInteger, index=True)
+    shared_attrs = Column(Text)
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs):
+        """Return the hash used to look up serialized attributes."""
+        return zlib.crc32(shared_attrs.encode("utf-8"))
+
+
+class Statistics(Base):  # type: ignore
+    """Hourly statistics of a numeric entity."""
+
+    __tablename__ = TABLE_STATISTICS
+    id = Column(Integer, primary_key=True)
+    created = Column(DateTime(timezone=True), default=dt_util.utcnow)
+    entity_id = Column(String(255))
+    start = Column(DateTime(timezone=True), index=True)
+    mean = Column(Float())
+    min = Column(Float())
+    max = Column(Float())
+    sum = Column(Float())
+
+    __table_args__ = (
+        # Used for fetching statistics for a certain entity at a specific time
+        Index("ix_statistics_entity_id_start", "entity_id", "start"),
+    )
+
+    def as_dict(self):
+        """Return a dict representation of the statistics."""
+        return {
+            "start": process_timestamp(self.start),
+            "mean": self.mean,
+            "min": self.min,
+            "max": self.max,
+            "sum": self.sum,
+        }
+
+
 class RecorderRuns(Base):  # type: ignore
     """Representation of recorder run."""
 
@@ -3,66 +3,77 @@ from datetime import timedelta
 import logging
 import time
 
+from sqlalchemy import func
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
 
 import homeassistant.util.dt as dt_util
 
-from .models import Events, RecorderRuns, States
-from .util import execute, session_scope
+from .models import Events, RecorderRuns, StateAttributes, States
+from .util import session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+# Maximum number of states and events to delete per purge batch
+MAX_ROWS_TO_PURGE = 5000
+
+# Number of free pages to release after a purge when
+# SQLite uses incremental auto vacuum
+INCREMENTAL_VACUUM_PAGES = 2000
+
 
 def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
     """Purge events and states older than purge_days ago.
 
-    Cleans up an timeframe of an hour, based on the oldest record.
+    Deletes at most MAX_ROWS_TO_PURGE states and events per call, by
+    primary key range. Returns False while there are more rows to delete so
+    the recorder can write queued events before purging the next batch.
     """
     purge_before = dt_util.utcnow() - timedelta(days=purge_days)
     _LOGGER.debug("Purging states and events before target %s", purge_before)
 
     try:
         with session_scope(session=instance.get_session()) as session:
-            # Purge a max of 1 hour, based on the oldest states or events record
-            batch_purge_before = purge_before
-
-            query = session.query(States).order_by(States.last_updated.asc()).limit(1)
-            states = execute(query, to_native=True, validate_entity_ids=False)
-            if states:
-                batch_purge_before = min(
-                    batch_purge_before,
-                    states[0].last_updated + timedelta(hours=1),
-                )
+            deleted_states = _purge_batch(
+                session, States, States.state_id, States.last_updated, purge_before
+            )
+            _LOGGER.debug("Deleted %s states", deleted_states)
 
-            query = session.query(Events).order_by(Events.time_fired.asc()).limit(1)
-            events = execute(query, to_native=True)
-            if events:
-                batch_purge_before = min(
-                    batch_purge_before,
-                    events[0].time_fired + timedelta(hours=1),
-                )
+            deleted_events = _purge_batch(
+                session, Events, Events.event_id, Events.time_fired, purge_before
+            )
+            _LOGGER.debug("Deleted %s events", deleted_events)
 
-            _LOGGER.debug("Purging states and events before %s", batch_purge_before)
+            instance.purge_batches += 1
+            instance.purged_states += deleted_states
+            instance.purged_events += deleted_events
 
-            deleted_rows = (
-                session.query(States)
-                .filter(States.last_updated < batch_purge_before)
-                .delete(synchronize_session=False)
-            )
-            _LOGGER.debug("Deleted %s states", deleted_rows)
+            # If a batch was full there may be more rows to purge,
+            # return false, as we are not done yet.
+            if MAX_ROWS_TO_PURGE in (deleted_states, deleted_events):
+                _LOGGER.debug(
+                    "Purging hasn't fully completed yet, %s states and %s events "
+                    "purged in %s batches so far",
+                    instance.purged_states,
+                    instance.purged_events,
+                    instance.purge_batches,
+                )
+                return False
 
+            # Attributes no longer referenced by any state
             deleted_rows = (
-                session.query(Events)
-                .filter(Events.time_fired < batch_purge_before)
+                session.query(StateAttributes)
+                .filter(
+                    ~StateAttributes.attributes_id.in_(
+                        session.query(States.attributes_id)
+                        .filter(States.attributes_id.isnot(None))
+                        .distinct()
+                    )
+                )
                 .delete(synchronize_session=False)
             )
-            _LOGGER.debug("Deleted %s events", deleted_rows)
-
-            # If states or events purging isn't processing the purge_before yet,
-            # return false, as we are not done yet.
-            if batch_purge_before != purge_before:
-                _LOGGER.debug("Purging hasn't fully completed yet")
-                return False
+            _LOGGER.debug("Deleted %s state attributes", deleted_rows)
+            if deleted_rows:
+                instance.clear_state_attributes_cache()
 
             # Recorder runs is small, no need to batch run it
             deleted_rows = (
@@ -73,15 +84,40 @@ def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
             )
             _LOGGER.debug("Deleted %s recorder_runs", deleted_rows)
 
-        if repack:
+        _LOGGER.debug(
+            "Purge completed, %s states and %s events purged in %s batches",
+            instance.purged_states,
+            instance.purged_events,
+            instance.purge_batches,
+        )
+        instance.purge_batches = instance.purged_states = instance.purged_events = 0
+
+        if instance.engine.driver == "pysqlite" and _sqlite_incremental_vacuum(
+            instance
+        ):
+            # Return the free pages to the file system in small steps,
+            # or all of them when repacking
+            _LOGGER.debug("Running incremental vacuum")
+            if repack:
+                instance.engine.execute("PRAGMA incremental_vacuum")
+            else:
+                instance.engine.execute(
+                    f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})"
+                )
+        elif repack:
             # Execute sqlite or postgresql vacuum command to free up space on disk
             if instance.engine.driver in ("pysqlite", "postgresql"):
                 _LOGGER.debug("Vacuuming SQL DB to free space")
+                if instance.engine.driver == "pysqlite":
+                    # Release free pages incrementally from now on
+                    instance.engine.execute("PRAGMA auto_vacuum=INCREMENTAL")
                 instance.engine.execute("VACUUM")
             # Optimize mysql / mariadb tables to free up space on disk
             elif instance.engine.driver in ("mysqldb", "pymysql"):
                 _LOGGER.debug("Optimizing SQL DB to free space")
-                instance.engine.execute("OPTIMIZE TABLE states, events, recorder_runs")
+                instance.engine.execute(
+                    "OPTIMIZE TABLE states, state_attributes, events, recorder_runs"
+                )
 
     except OperationalError as err:
         # Retry when one of the following MySQL errors occurred:
@@ -101,3 +137,32 @@ def purge_old_data(instance, purge_days: int, repack: bool) -> bool:
     except SQLAlchemyError as err:
         _LOGGER.warning("Error purging history: %s", err)
     return True
+
+
+def _purge_batch(session, table, id_column, time_column, purge_before):
+    """Delete the oldest rows before purge_before by primary key range.
+
+    Returns the number of deleted rows, at most MAX_ROWS_TO_PURGE.
+    """
+    batch = (
+        session.query(id_column)
+        .filter(time_column < purge_before)
+        .order_by(id_column)
+        .limit(MAX_ROWS_TO_PURGE)
+        .subquery()
+    )
+    max_id = session.query(func.max(batch.c[id_column.name])).scalar()
+    if max_id is None:
+        return 0
+
+    return (
+        session.query(table)
+        .filter(id_column <= max_id)
+        .filter(time_column < purge_before)
+        .delete(synchronize_session=False)
+    )
+
+
+def _sqlite_incremental_vacuum(instance):
+    """Return if the SQLite database uses incremental auto vacuum."""
+    return instance.engine.execute("PRAGMA auto_vacuum").scalar() == 2
@@ -0,0 +1,158 @@
+"""Long-term statistics of numeric sensors."""
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+import json
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+
+from homeassistant.const import (
+    ATTR_UNIT_OF_MEASUREMENT,
+    ENERGY_KILO_WATT_HOUR,
+    ENERGY_WATT_HOUR,
+    VOLUME_CUBIC_FEET,
+    VOLUME_CUBIC_METERS,
+)
+import homeassistant.util.dt as dt_util
+
+from .models import StateAttributes, States, Statistics, process_timestamp
+from .util import execute, session_scope
+
+_LOGGER = logging.getLogger(__name__)
+
+STATISTICS_PERIOD = timedelta(hours=1)
+
+STATISTICS_DOMAINS = ("sensor",)
+
+# Sensors with these units are meters, their statistics also
+# include how much the meter increased during the period
+METER_UNITS = (
+    ENERGY_KILO_WATT_HOUR,
+    ENERGY_WATT_HOUR,
+    VOLUME_CUBIC_FEET,
+    VOLUME_CUBIC_METERS,
+)
+
+
+def get_start_time():
+    """Return the start of the last full statistics period."""
+    last_hour = dt_util.utcnow() - STATISTICS_PERIOD
+    return last_hour.replace(minute=0, second=0, microsecond=0)
+
+
+def compile_statistics(instance, start):
+    """Compile statistics of the numeric sensors for the period at start.
+
+    Periods that were already compiled are skipped.
+    """
+    end = start + STATISTICS_PERIOD
+    _LOGGER.debug("Compiling statistics for %s-%s", start, end)
+
+    try:
+        _compile_statistics(instance, start, end)
+    except SQLAlchemyError as err:
+        _LOGGER.warning("Error compiling statistics: %s", err)
+
+
+def _compile_statistics(instance, start, end):
+    """Compile and store the statistics of the period start - end."""
+    with session_scope(session=instance.get_session()) as session:
+        if session.query(Statistics.id).filter(Statistics.start == start).first():
+            _LOGGER.debug("Statistics for %s already compiled", start)
+            return
+
+        query = (
+            session.query(
+                States.entity_id,
+                States.state,
+                func.coalesce(States.attributes, StateAttributes.shared_attrs).label(
+                    "attributes"
+                ),
+                States.last_updated,
+            )
+            .outerjoin(
+                StateAttributes, States.attributes_id == StateAttributes.attributes_id
+            )
+            .filter(States.domain.in_(STATISTICS_DOMAINS))
+            .filter((States.last_updated >= start) & (States.last_updated < end))
+            .order_by(States.entity_id, States.last_updated)
+        )
+
+        decoded_attributes = {}
+        for entity_id, rows in groupby(execute(query), lambda row: row.entity_id):
+            stats = _compile_entity_statistics(list(rows), end, decoded_attributes)
+            if stats is not None:
+                session.add(Statistics(entity_id=entity_id, start=start, **stats))
+
+
+def _compile_entity_statistics(rows, end, decoded_attributes):
+    """Compile the statistics of one entity from its state rows."""
+    unit = None
+    samples = []
+    for row in rows:
+        attributes = decoded_attributes.get(row.attributes)
+        if attributes is None:
+            try:
+                attributes = json.loads(row.attributes or "{}")
+            except ValueError:
+                attributes = {}
+            decoded_attributes[row.attributes] = attributes
+
+        try:
+            value = float(row.state)
+        except (TypeError, ValueError):
+            continue
+
+        unit = attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+        samples.append((process_timestamp(row.last_updated), value))
+
+    # Only sensors with a unit of measurement are numeric sensors
+    if not samples or unit is None:
+        return None
+
+    values = [value for _, value in samples]
+    period_start = samples[0][0]
+    weighted_sum = 0.0
+    for (updated, value), (next_updated, _) in zip(
+        samples, samples[1:] + [(end, None)]
+    ):
+        weighted_sum += value * (next_updated - updated).total_seconds()
+    duration = (end - period_start).total_seconds()
+
+    stats = {
+        "mean": weighted_sum / duration if duration else values[-1],
+        "min": min(values),
+        "max": max(values),
+        "sum": None,
+    }
+
+    if unit in METER_UNITS:
+        increase = 0.0
+        for previous, value in zip(values, values[1:]):
+            # A meter that goes down was reset
+            increase += value - previous if value >= previous else value
+        stats["sum"] = increase
+
+    return stats
+
+
+def statistics_during_period(hass, start_time, end_time=None, entity_ids=None):
+    """Return hourly statistics during UTC period start_time - end_time.
+
+    The result maps each entity_id to its statistics ordered by start.
+    """
+    with session_scope(hass=hass) as session:
+        query = session.query(Statistics).filter(Statistics.start >= start_time)
+        if end_time is not None:
+            query = query.filter(Statistics.start < end_time)
+        if entity_ids is not None:
+            query = query.filter(Statistics.entity_id.in_(entity_ids))
+        query = query.order_by(Statistics.entity_id, Statistics.start)
+
+        result = defaultdict(list)
+        for stats in execute(query):
+            result[stats.entity_id].append(stats.as_dict())
+
+    return dict(result)
@@ -31,6 +31,7 @@ from homeassistant.helpers.script import (
     CONF_MAX,
     CONF_MAX_EXCEEDED,
     SCRIPT_MODE_SINGLE,
+    ReferenceIndex,
     Script,
     make_script_schema,
 )
@@ -41,6 +42,8 @@ _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "script"
 
+DATA_REFERENCE_INDEX = "script_reference_index"
+
 ATTR_LAST_ACTION = "last_action"
 ATTR_LAST_TRIGGERED = "last_triggered"
 ATTR_VARIABLES = "variables"
@@ -94,13 +97,7 @@ def scripts_with_entity(hass: HomeAssistant, entity_id: str) -> List[str]:
     if DOMAIN not in hass.data:
         return []
 
-    component = hass.data[DOMAIN]
-
-    return [
-        script_entity.entity_id
-        for script_entity in component.entities
-        if entity_id in script_entity.script.referenced_entities
-    ]
+    return hass.data[DATA_REFERENCE_INDEX].async_referencing_entity(entity_id)
 
 
 @callback
@@ -125,13 +122,7 @@ def scripts_with_device(hass: HomeAssistant, device_id: str) -> List[str]:
     if DOMAIN not in hass.data:
         return []
 
-    component = hass.data[DOMAIN]
-
-    return [
-        script_entity.entity_id
-        for script_entity in component.entities
-        if device_id in script_entity.script.referenced_devices
-    ]
+    return hass.data[DATA_REFERENCE_INDEX].async_referencing_device(device_id)
 
 
 @callback
@@ -153,6 +144,7 @@ def devices_in_script(hass: HomeAssistant, entity_id: str) -> List[str]:
 async def async_setup(hass, config):
     """Load the scripts from the configuration."""
     hass.data[DOMAIN] = component = EntityComponent(_LOGGER, DOMAIN, hass)
+    hass.data[DATA_REFERENCE_INDEX] = ReferenceIndex()
 
     await _async_process_config(hass, config, component)
 
@@ -331,8 +323,17 @@ class ScriptEntity(ToggleEntity):
         """Turn script off."""
         await self.script.async_stop()
 
+    async def async_added_to_hass(self):
+        """Index the references of the script."""
+        self.hass.data[DATA_REFERENCE_INDEX].async_add(
+            self.entity_id,
+            self.script.referenced_entities,
+            self.script.referenced_devices,
+        )
+
     async def async_will_remove_from_hass(self):
         """Stop script and remove service when it will be removed from Home Assistant."""
+        self.hass.data[DATA_REFERENCE_INDEX].async_remove(self.entity_id)
         await self.script.async_stop()
 
         # remove service
@@ -256,17 +256,13 @@ async def handle_render_template(hass, connection, msg):
     info = None
 
     if timeout:
-        try:
-            timed_out = await template.async_render_will_timeout(timeout)
-        except TemplateError as ex:
-            connection.send_error(msg["id"], const.ERR_TEMPLATE_ERROR, str(ex))
-            return
-
-        if timed_out:
+        # Render in a worker first so a slow template cannot block the loop
+        render_info = await template.async_render_to_info_in_worker(
+            timeout, variables
+        )
+        if render_info.exception:
             connection.send_error(
-                msg["id"],
-                const.ERR_TEMPLATE_ERROR,
-                f"Exceeded maximum execution time of {timeout}s",
+                msg["id"], const.ERR_TEMPLATE_ERROR, str(render_info.exception)
             )
             return
 
@@ -75,6 +75,13 @@ class WebSocketHandler:
 
                 self._logger.debug("Sending %s", message)
 
+                if isinstance(message, bytes):
+                    # Already serialized json, send it as is in a text frame
+                    await self.wsock._writer.send(  # pylint: disable=protected-access
+                        message, binary=False
+                    )
+                    continue
+
                 if not isinstance(message, str):
                     message = message_to_json(message)
 
@@ -2,7 +2,7 @@
 
 from functools import lru_cache
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import voluptuous as vol
 
@@ -28,8 +28,10 @@ MINIMAL_MESSAGE_SCHEMA = vol.Schema(
 # Base schema to extend by message handlers
 BASE_COMMAND_MESSAGE_SCHEMA = vol.Schema({vol.Required("id"): cv.positive_int})
 
-IDEN_TEMPLATE = "__IDEN__"
-IDEN_JSON_TEMPLATE = '"__IDEN__"'
+# Pieces of an event message around the id and the serialized event
+EVENT_MESSAGE_PREFIX = b'{"id": '
+EVENT_MESSAGE_TYPE = b', "type": "event", "event": '
+EVENT_MESSAGE_SUFFIX = b"}"
 
 
 def result_message(iden: int, result: Any = None) -> Dict:
@@ -52,26 +54,49 @@ def event_message(iden: JSON_TYPE, event: Any) -> Dict:
     return {"id": iden, "type": "event", "event": event}
 
 
-def cached_event_message(iden: int, event: Event) -> str:
-    """Return an event message.
+def cached_event_message(iden: int, event: Event) -> bytes:
+    """Return an event message serialized to json.
 
-    Serialize to json once per message.
+    Serialize to json once per event.
 
     Since we can have many clients connected that are
     all getting many of the same events (mostly state changed)
     we can avoid serializing the same data for each connection.
+    The message of each connection only splices its id in
+    front of the shared serialized event.
     """
-    return _cached_event_message(event).replace(IDEN_JSON_TEMPLATE, str(iden), 1)
+    event_json = _cached_event_json(event)
+    if event_json is None:
+        return message_to_json(
+            error_message(iden, const.ERR_UNKNOWN_ERROR, "Invalid JSON in response")
+        ).encode("utf-8")
+    return b"".join(
+        (
+            EVENT_MESSAGE_PREFIX,
+            str(iden).encode("ascii"),
+            EVENT_MESSAGE_TYPE,
+            event_json,
+            EVENT_MESSAGE_SUFFIX,
+        )
+    )
 
 
 @lru_cache(maxsize=128)
-def _cached_event_message(event: Event) -> str:
-    """Cache and serialize the event to json.
+def _cached_event_json(event: Event) -> Optional[bytes]:
+    """Cache and serialize the event to utf-8 encoded json.
 
-    The IDEN_TEMPLATE is used which will be replaced
-    with the actual iden in cached_event_message
+    Returns None if the event cannot be serialized.
     """
-    return message_to_json(event_message(IDEN_TEMPLATE, event))
+    try:
+        return const.JSON_DUMP(event).encode("utf-8")
+    except (ValueError, TypeError):
+        _LOGGER.error(
+            "Unable to serialize to JSON. Bad data found at %s",
+            format_unserializable_data(
+                find_paths_unserializable_data(event, dump=const.JSON_DUMP)
+            ),
+        )
+        return None
 
 
 def message_to_json(message: Any) -> str:
@@ -28,7 +28,9 @@ from typing import (
     List,
     Mapping,
     Optional,
+    Sequence,
     Set,
+    Tuple,
     TypeVar,
     Union,
     cast,
@@ -114,6 +116,9 @@ TIMEOUT_EVENT_START = 15
 
 _LOGGER = logging.getLogger(__name__)
 
+# Read only attributes shared by all states without attributes
+_EMPTY_ATTRIBUTES: MappingProxyType = MappingProxyType({})
+
 
 def split_entity_id(entity_id: str) -> List[str]:
     """Split a state entity ID into domain and object ID."""
@@ -645,12 +650,50 @@ class Event:
         )
 
 
+@attr.s(slots=True)
+class EventTypeStats:
+    """Dispatch counters for a single event type.
+
+    fired: number of times the event type was fired.
+    listener_calls: number of listener jobs run or scheduled.
+    duration: seconds spent dispatching, including inline callbacks.
+    """
+
+    fired: int = attr.ib(default=0)
+    listener_calls: int = attr.ib(default=0)
+    duration: float = attr.ib(default=0.0)
+
+    def as_dict(self) -> Dict[str, Union[int, float]]:
+        """Return a dictionary representation of the stats."""
+        return {
+            "fired": self.fired,
+            "listener_calls": self.listener_calls,
+            "duration": self.duration,
+        }
+
+
+_FilterableJob = Tuple[HassJob, Optional[Callable[[Event], bool]]]
+
+
 class EventBus:
     """Allow the firing of and listening for events."""
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
-        self._listeners: Dict[str, List[HassJob]] = {}
+        self._listeners: Dict[str, List[_FilterableJob]] = {}
+        # Listeners per event type merged with MATCH_ALL listeners. Built
+        # lazily on first fire and dropped whenever a listener is added or
+        # removed so async_fire never has to copy or merge lists.
+        self._dispatch_jobs: Dict[str, Tuple[_FilterableJob, ...]] = {}
+        # event_type -> event data key -> data value -> jobs. The inner
+        # mappings are replaced instead of mutated so a dispatch in progress
+        # is never affected by listeners being added or removed.
+        self._keyed_listeners: Dict[str, Dict[str, Dict[Any, Tuple[HassJob, ...]]]] = {}
+        self._keyed_listener_count: Dict[str, int] = {}
+        self._stats: Dict[str, EventTypeStats] = {}
+        # Set by the core timer so it can start ticking once something
+        # listens for EVENT_TIME_CHANGED.
+        self._time_changed_wakeup: Optional[CALLBACK_TYPE] = None
         self._hass = hass
 
     @callback
@@ -659,7 +702,19 @@ class EventBus:
 
         This method must be run in the event loop.
         """
-        return {key: len(self._listeners[key]) for key in self._listeners}
+        listeners = {key: len(self._listeners[key]) for key in self._listeners}
+        for key, count in self._keyed_listener_count.items():
+            listeners[key] = listeners.get(key, 0) + count
+        return listeners
+
+    @callback
+    def async_keyed_listeners(self, event_type: str, data_key: str) -> Dict[Any, int]:
+        """Return dictionary with keys and the number of keyed listeners.
+
+        This method must be run in the event loop.
+        """
+        index = self._keyed_listeners.get(event_type, {}).get(data_key, {})
+        return {key: len(jobs) for key, jobs in index.items()}
 
     @property
     def listeners(self) -> Dict[str, int]:
@@ -689,25 +744,142 @@ class EventBus:
     ) -> None:
         """Fire an event.
 
+        Callback listeners are run inline, all other listeners are scheduled.
+
         This method must be run in the event loop.
         """
-        listeners = self._listeners.get(event_type, [])
+        self._async_dispatch(
+            event_type, (Event(event_type, event_data, origin, time_fired, context),)
+        )
+
+    @callback
+    def async_fire_many(
+        self,
+        event_type: str,
+        event_data_list: Iterable[Optional[Dict[str, Any]]],
+        origin: EventOrigin = EventOrigin.local,
+        context: Optional[Context] = None,
+        time_fired: Optional[datetime.datetime] = None,
+    ) -> None:
+        """Fire a batch of events of the same type in a single dispatch pass.
+
+        The listener snapshot is looked up once for the whole batch and the
+        events are delivered in order.
 
-        # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
-        match_all_listeners = self._listeners.get(MATCH_ALL)
-        if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
-            listeners = match_all_listeners + listeners
+        This method must be run in the event loop.
+        """
+        self._async_dispatch(
+            event_type,
+            [
+                Event(event_type, event_data, origin, time_fired, context)
+                for event_data in event_data_list
+            ],
+        )
 
-        event = Event(event_type, event_data, origin, time_fired, context)
+    @callback
+    def _async_dispatch(self, event_type: str, events: Sequence[Event]) -> None:
+        """Deliver events of a single type to their listeners."""
+        jobs = self._dispatch_jobs.get(event_type)
+        if jobs is None:
+            jobs = self._async_build_dispatch_jobs(event_type)
+        keyed_listeners = self._keyed_listeners.get(event_type)
+
+        stats = self._stats.get(event_type)
+        if stats is None:
+            stats = self._stats[event_type] = EventTypeStats()
+        stats.fired += len(events)
 
         if event_type != EVENT_TIME_CHANGED:
-            _LOGGER.debug("Bus:Handling %s", event)
+            for event in events:
+                _LOGGER.debug("Bus:Handling %s", event)
 
-        if not listeners:
+        if not jobs and keyed_listeners is None:
             return
 
-        for job in listeners:
+        start = monotonic()
+        calls = 0
+        for event in events:
+            for job, event_filter in jobs:
+                if event_filter is not None and not self._async_run_filter(
+                    event_filter, event
+                ):
+                    continue
+                self._async_run_listener(job, event)
+                calls += 1
+
+            if keyed_listeners is None:
+                continue
+
+            for data_key, index in keyed_listeners.items():
+                try:
+                    keyed_jobs = index.get(event.data.get(data_key))
+                except TypeError:
+                    # Unhashable values can never match a key
+                    continue
+                if keyed_jobs is None:
+                    continue
+                for job in keyed_jobs:
+                    self._async_run_listener(job, event)
+                calls += len(keyed_jobs)
+
+        stats.listener_calls += calls
+        stats.duration += monotonic() - start
+
+    @callback
+    def _async_run_listener(self, job: HassJob, event: Event) -> None:
+        """Run a callback listener inline or schedule any other listener."""
+        if job.job_type != HassJobType.Callback:
             self._hass.async_add_hass_job(job, event)
+            return
+
+        try:
+            job.target(event)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error running listener %s for %s", job, event)
+
+    @callback
+    def _async_run_filter(
+        self, event_filter: Callable[[Event], bool], event: Event
+    ) -> bool:
+        """Run an event filter, treating errors as not matching."""
+        try:
+            return event_filter(event)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception(
+                "Error running event filter %s for %s", event_filter, event
+            )
+            return False
+
+    @callback
+    def _async_build_dispatch_jobs(self, event_type: str) -> Tuple[_FilterableJob, ...]:
+        """Build and cache the listener snapshot for an event type."""
+        jobs = tuple(self._listeners.get(event_type, ()))
+
+        # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners and
+        # EVENT_TIME_CHANGED is only fired for those asking for it
+        if event_type not in (EVENT_HOMEASSISTANT_CLOSE, EVENT_TIME_CHANGED):
+            jobs = tuple(self._listeners.get(MATCH_ALL, ())) + jobs
+
+        self._dispatch_jobs[event_type] = jobs
+        return jobs
+
+    @callback
+    def _async_invalidate_dispatch_jobs(self, event_type: str) -> None:
+        """Drop cached listener snapshots affected by a listener change."""
+        if event_type == MATCH_ALL:
+            self._dispatch_jobs.clear()
+        else:
+            self._dispatch_jobs.pop(event_type, None)
+
+    @callback
+    def async_dispatch_stats(self) -> Dict[str, Dict[str, Union[int, float]]]:
+        """Return dictionary with dispatch counters per event type.
+
+        This method must be run in the event loop.
+        """
+        return {
+            event_type: stats.as_dict() for event_type, stats in self._stats.items()
+        }
 
     def listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
@@ -726,26 +898,117 @@ class EventBus:
         return remove_listener
 
     @callback
-    def async_listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
+    def async_listen(
+        self,
+        event_type: str,
+        listener: Callable,
+        event_filter: Optional[Callable[[Event], bool]] = None,
+    ) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
 
         To listen to all events specify the constant ``MATCH_ALL``
         as event_type.
 
+        An optional event_filter, which must be a callback, is evaluated
+        before the listener is run or scheduled. The listener is only
+        called for events where it returns True.
+
         This method must be run in the event loop.
         """
-        return self._async_listen_job(event_type, HassJob(listener))
+        if event_filter is not None and not is_callback(event_filter):
+            raise HomeAssistantError(f"Event filter {event_filter} is not a callback")
+        return self._async_listen_filterable_job(
+            event_type, (HassJob(listener), event_filter)
+        )
 
     @callback
-    def _async_listen_job(self, event_type: str, hassjob: HassJob) -> CALLBACK_TYPE:
-        self._listeners.setdefault(event_type, []).append(hassjob)
+    def _async_listen_filterable_job(
+        self, event_type: str, filterable_job: _FilterableJob
+    ) -> CALLBACK_TYPE:
+        self._listeners.setdefault(event_type, []).append(filterable_job)
+        self._async_invalidate_dispatch_jobs(event_type)
+
+        if event_type == EVENT_TIME_CHANGED and self._time_changed_wakeup is not None:
+            self._time_changed_wakeup()
 
         def remove_listener() -> None:
             """Remove the listener."""
-            self._async_remove_listener(event_type, hassjob)
+            self._async_remove_listener(event_type, filterable_job)
 
         return remove_listener
 
+    @callback
+    def async_listen_keyed(
+        self,
+        event_type: str,
+        data_key: str,
+        keys: Iterable[Any],
+        listener: Callable,
+    ) -> CALLBACK_TYPE:
+        """Listen for events of a specific type matching on an event data key.
+
+        The listener is only called for events where event.data[data_key]
+        is one of keys. Matching listeners are found with a dict lookup so
+        events for other keys cost nothing, no matter how many listeners
+        are registered.
+
+        This method must be run in the event loop.
+        """
+        if event_type == MATCH_ALL:
+            raise HomeAssistantError("Keyed listeners require a specific event type")
+
+        keys = tuple(keys)
+        job = HassJob(listener)
+        by_data_key = self._keyed_listeners.get(event_type, {})
+        index = dict(by_data_key.get(data_key, {}))
+        for key in keys:
+            index[key] = index.get(key, ()) + (job,)
+        self._keyed_listeners[event_type] = {**by_data_key, data_key: index}
+        self._keyed_listener_count[event_type] = (
+            self._keyed_listener_count.get(event_type, 0) + 1
+        )
+
+        removed = False
+
+        @callback
+        def remove_listener() -> None:
+            """Remove the keyed listener."""
+            nonlocal removed
+            if removed:
+                return
+            removed = True
+            self._async_remove_keyed_listener(event_type, data_key, keys, job)
+
+        return remove_listener
+
+    @callback
+    def _async_remove_keyed_listener(
+        self, event_type: str, data_key: str, keys: Iterable[Any], job: HassJob
+    ) -> None:
+        """Remove a keyed listener of a specific event_type."""
+        by_data_key = dict(self._keyed_listeners[event_type])
+        index = dict(by_data_key[data_key])
+        for key in keys:
+            jobs = tuple(keyed_job for keyed_job in index[key] if keyed_job is not job)
+            if jobs:
+                index[key] = jobs
+            else:
+                del index[key]
+
+        if index:
+            by_data_key[data_key] = index
+        else:
+            del by_data_key[data_key]
+
+        if by_data_key:
+            self._keyed_listeners[event_type] = by_data_key
+        else:
+            del self._keyed_listeners[event_type]
+
+        self._keyed_listener_count[event_type] -= 1
+        if not self._keyed_listener_count[event_type]:
+            del self._keyed_listener_count[event_type]
+
     def listen_once(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen once for event of a specific type.
 
@@ -775,12 +1038,12 @@ class EventBus:
 
         This method must be run in the event loop.
         """
-        job: Optional[HassJob] = None
+        filterable_job: Optional[_FilterableJob] = None
 
         @callback
         def _onetime_listener(event: Event) -> None:
             """Remove listener from event bus and then fire listener."""
-            nonlocal job
+            nonlocal filterable_job
             if hasattr(_onetime_listener, "run"):
                 return
             # Set variable so that we will never run twice.
@@ -789,30 +1052,36 @@ class EventBus:
             # multiple times as well.
             # This will make sure the second time it does nothing.
             setattr(_onetime_listener, "run", True)
-            assert job is not None
-            self._async_remove_listener(event_type, job)
+            assert filterable_job is not None
+            self._async_remove_listener(event_type, filterable_job)
             self._hass.async_run_job(listener, event)
 
-        job = HassJob(_onetime_listener)
+        filterable_job = (HassJob(_onetime_listener), None)
 
-        return self._async_listen_job(event_type, job)
+        return self._async_listen_filterable_job(event_type, filterable_job)
 
     @callback
-    def _async_remove_listener(self, event_type: str, hassjob: HassJob) -> None:
+    def _async_remove_listener(
+        self, event_type: str, filterable_job: _FilterableJob
+    ) -> None:
         """Remove a listener of a specific event_type.
 
         This method must be run in the event loop.
         """
         try:
-            self._listeners[event_type].remove(hassjob)
+            self._listeners[event_type].remove(filterable_job)
 
             # delete event_type list if empty
             if not self._listeners[event_type]:
                 self._listeners.pop(event_type)
+
+            self._async_invalidate_dispatch_jobs(event_type)
         except (KeyError, ValueError):
             # KeyError is key event_type listener did not exist
             # ValueError if listener did not exist within event_type
-            _LOGGER.exception("Unable to remove unknown job listener %s", hassjob)
+            _LOGGER.exception(
+                "Unable to remove unknown job listener %s", filterable_job
+            )
 
 
 class State:
@@ -867,7 +1136,12 @@ class State:
 
         self.entity_id = entity_id.lower()
         self.state = state
-        self.attributes = MappingProxyType(attributes or {})
+        if isinstance(attributes, MappingProxyType):
+            self.attributes = attributes
+        elif attributes:
+            self.attributes = MappingProxyType(attributes)
+        else:
+            self.attributes = _EMPTY_ATTRIBUTES
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
         self.context = context or Context()
@@ -1153,40 +1427,81 @@ class StateMachine:
 
         This method must be run in the event loop.
         """
-        entity_id = entity_id.lower()
-        new_state = str(new_state)
-        attributes = attributes or {}
-        old_state = self._states.get(entity_id)
-        if old_state is None:
-            same_state = False
-            same_attr = False
-            last_changed = None
-        else:
-            same_state = old_state.state == new_state and not force_update
-            same_attr = old_state.attributes == MappingProxyType(attributes)
-            last_changed = old_state.last_changed if same_state else None
+        self.async_set_many(
+            ((entity_id, new_state, attributes),), force_update, context
+        )
 
-        if same_state and same_attr:
-            return
+    def set_many(
+        self,
+        updates: Iterable[Tuple[str, str, Optional[Mapping[str, Any]]]],
+        force_update: bool = False,
+        context: Optional[Context] = None,
+    ) -> None:
+        """Set the state of multiple entities at once."""
+        run_callback_threadsafe(
+            self._loop, self.async_set_many, list(updates), force_update, context
+        ).result()
+
+    @callback
+    def async_set_many(
+        self,
+        updates: Iterable[Tuple[str, str, Optional[Mapping[str, Any]]]],
+        force_update: bool = False,
+        context: Optional[Context] = None,
+    ) -> None:
+        """Set the state of multiple entities at once.
 
-        if context is None:
-            context = Context()
+        Updates is an iterable of (entity_id, state, attributes) tuples. All
+        changed states share one timestamp and context and unchanged entries
+        are skipped. The whole batch is applied before any state changed
+        event is fired, the events are then fired in a single dispatch pass.
 
+        This method must be run in the event loop.
+        """
+        states = self._states
         now = dt_util.utcnow()
+        event_data_list = []
+
+        for entity_id, new_state, attributes in updates:
+            entity_id = entity_id.lower()
+            new_state = str(new_state)
+            attributes = attributes or {}
+            old_state = states.get(entity_id)
+            if old_state is None:
+                last_changed = None
+            else:
+                same_state = old_state.state == new_state and not force_update
+                old_attributes = old_state.attributes
+                if attributes is old_attributes or old_attributes == attributes:
+                    if same_state:
+                        continue
+                    # Share the unchanged attributes with the previous state
+                    attributes = old_attributes
+                last_changed = old_state.last_changed if same_state else None
+
+            if context is None:
+                context = Context()
+
+            state = State(
+                entity_id,
+                new_state,
+                attributes,
+                last_changed,
+                now,
+                context,
+                old_state is None,
+            )
+            states[entity_id] = state
+            event_data_list.append(
+                {"entity_id": entity_id, "old_state": old_state, "new_state": state}
+            )
 
-        state = State(
-            entity_id,
-            new_state,
-            attributes,
-            last_changed,
-            now,
-            context,
-            old_state is None,
-        )
-        self._states[entity_id] = state
-        self._bus.async_fire(
+        if not event_data_list:
+            return
+
+        self._bus.async_fire_many(
             EVENT_STATE_CHANGED,
-            {"entity_id": entity_id, "old_state": old_state, "new_state": state},
+            event_data_list,
             EventOrigin.local,
             context,
             time_fired=now,
@@ -1737,8 +2052,14 @@ class Config:
 
 
 def _async_create_timer(hass: HomeAssistant) -> None:
-    """Create a timer that will start on HOMEASSISTANT_START."""
+    """Create a timer that will start on HOMEASSISTANT_START.
+
+    Time based helpers schedule their own deadlines on the event loop, so the
+    timer only ticks every second while something listens for
+    EVENT_TIME_CHANGED.
+    """
     handle = None
+    stopped = False
     timer_context = Context()
 
     def schedule_tick(now: datetime.datetime) -> None:
@@ -1752,6 +2073,8 @@ def _async_create_timer(hass: HomeAssistant) -> None:
     @callback
     def fire_time_event(target: float) -> None:
         """Fire next time event."""
+        nonlocal handle
+
         now = dt_util.utcnow()
 
         hass.bus.async_fire(
@@ -1768,15 +2091,30 @@ def _async_create_timer(hass: HomeAssistant) -> None:
                 context=timer_context,
             )
 
+        if not hass.bus.async_listeners().get(EVENT_TIME_CHANGED):
+            handle = None
+            return
+
         schedule_tick(now)
 
+    @callback
+    def start_timer() -> None:
+        """Start ticking if the timer is idle."""
+        if handle is None and not stopped:
+            schedule_tick(dt_util.utcnow())
+
     @callback
     def stop_timer(_: Event) -> None:
         """Stop the timer."""
+        nonlocal stopped
+
+        stopped = True
         if handle is not None:
             handle.cancel()
 
     hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, stop_timer)
+    hass.bus._time_changed_wakeup = start_timer  # pylint: disable=protected-access
 
     _LOGGER.info("Timer:starting")
-    schedule_tick(dt_util.utcnow())
+    if hass.bus.async_listeners().get(EVENT_TIME_CHANGED):
+        schedule_tick(dt_util.utcnow())
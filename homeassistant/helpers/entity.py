@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 import functools as ft
 import logging
 from timeit import default_timer as timer
-from typing import Any, Awaitable, Dict, Iterable, List, Optional
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, Tuple
 
 from homeassistant.config import DATA_CUSTOMIZE
 from homeassistant.const import (
@@ -123,6 +123,11 @@ class Entity(ABC):
     # If entity is added to an entity platform
     _added = False
 
+    # State writes collected while the platform defers state writes
+    _pending_state_writes: Optional[
+        Dict[str, Tuple[str, Dict[str, Any], bool, Optional[Context]]]
+    ] = None
+
     @property
     def should_poll(self) -> bool:
         """Return True if entity has to be polled for state.
@@ -405,6 +410,15 @@ class Entity(ABC):
             self._context = None
             self._context_set = None
 
+        if self._pending_state_writes is not None:
+            self._pending_state_writes[self.entity_id] = (
+                state,
+                attr,
+                self.force_update,
+                self._context,
+            )
+            return
+
         self.hass.states.async_set(
             self.entity_id, state, attr, self.force_update, self._context
         )
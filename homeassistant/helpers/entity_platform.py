@@ -4,12 +4,23 @@ from contextvars import ContextVar
 from datetime import datetime, timedelta
 from logging import Logger
 from types import ModuleType
-from typing import TYPE_CHECKING, Callable, Coroutine, Dict, Iterable, List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
 from homeassistant import config_entries
 from homeassistant.const import ATTR_RESTORED, DEVICE_DEFAULT_NAME
 from homeassistant.core import (
     CALLBACK_TYPE,
+    Context,
     ServiceCall,
     callback,
     split_entity_id,
@@ -69,6 +80,10 @@ class EntityPlatform:
         # Method to cancel the retry of setup
         self._async_cancel_retry_setup: Optional[CALLBACK_TYPE] = None
         self._process_updates: Optional[asyncio.Lock] = None
+        # Pending state writes while state writes are deferred
+        self._pending_state_writes: Optional[
+            Dict[str, Tuple[str, Dict[str, Any], bool, Optional[Context]]]
+        ] = None
 
         self.parallel_updates: Optional[asyncio.Semaphore] = None
 
@@ -588,6 +603,57 @@ class EntityPlatform:
             self.platform_name, name, handle_service, schema
         )
 
+    @callback
+    def async_defer_state_writes(self) -> None:
+        """Start collecting state writes of the entities of this platform.
+
+        Until async_flush_state_writes is called, async_write_ha_state only
+        records the latest state of each entity. Integrations that receive
+        many updates at once can use this to write them in one batch.
+        """
+        if self._pending_state_writes is not None:
+            return
+
+        self._pending_state_writes = {}
+        for entity in self.entities.values():
+            entity._pending_state_writes = (  # pylint: disable=protected-access
+                self._pending_state_writes
+            )
+
+    @callback
+    def async_flush_state_writes(self) -> None:
+        """Write the pending entity states and stop deferring state writes."""
+        pending = self._pending_state_writes
+        if pending is None:
+            return
+
+        self._pending_state_writes = None
+        for entity in self.entities.values():
+            entity._pending_state_writes = None  # pylint: disable=protected-access
+
+        # Consecutive entries sharing force update and context are written
+        # together
+        batch: List[Tuple[str, str, Dict[str, Any]]] = []
+        batch_force_update = False
+        batch_context: Optional[Context] = None
+        for entity_id, (state, attr, force_update, context) in pending.items():
+            # Skip entities that were removed in the meantime
+            if entity_id not in self.entities:
+                continue
+            if batch and (
+                force_update != batch_force_update or context is not batch_context
+            ):
+                self.hass.states.async_set_many(
+                    batch, batch_force_update, batch_context
+                )
+                batch = []
+            batch_force_update = force_update
+            batch_context = context
+            batch.append((entity_id, state, attr))
+
+        if batch:
+            self.hass.states.async_set_many(batch, batch_force_update, batch_context)
+
     async def _update_entity_states(self, now: datetime) -> None:
         """Update the states of all the polling entities.
 
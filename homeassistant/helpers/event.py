@@ -23,10 +23,8 @@ import attr
 
 from homeassistant.const import (
     ATTR_ENTITY_ID,
-    ATTR_NOW,
     EVENT_CORE_CONFIG_UPDATE,
     EVENT_STATE_CHANGED,
-    EVENT_TIME_CHANGED,
     MATCH_ALL,
     SUN_EVENT_SUNRISE,
     SUN_EVENT_SUNSET,
@@ -50,9 +48,6 @@ from homeassistant.loader import bind_hass
 from homeassistant.util import dt as dt_util
 from homeassistant.util.async_ import run_callback_threadsafe
 
-TRACK_STATE_CHANGE_CALLBACKS = "track_state_change_callbacks"
-TRACK_STATE_CHANGE_LISTENER = "track_state_change_listener"
-
 TRACK_STATE_ADDED_DOMAIN_CALLBACKS = "track_state_added_domain_callbacks"
 TRACK_STATE_ADDED_DOMAIN_LISTENER = "track_state_added_domain_listener"
 
@@ -232,55 +227,17 @@ def async_track_state_change_event(
 
     In order to avoid having to iterate a long list
     of EVENT_STATE_CHANGED and fire and create a job
-    for each one, we keep a dict of entity ids that
-    care about the state change events so we can
+    for each one, the event bus keeps an index of the entity ids
+    that care about the state change events so it can
     do a fast dict lookup to route events.
     """
     entity_ids = _async_string_to_lower_list(entity_ids)
     if not entity_ids:
         return _remove_empty_listener
 
-    entity_callbacks = hass.data.setdefault(TRACK_STATE_CHANGE_CALLBACKS, {})
-
-    if TRACK_STATE_CHANGE_LISTENER not in hass.data:
-
-        @callback
-        def _async_state_change_dispatcher(event: Event) -> None:
-            """Dispatch state changes by entity_id."""
-            entity_id = event.data.get("entity_id")
-
-            if entity_id not in entity_callbacks:
-                return
-
-            for job in entity_callbacks[entity_id][:]:
-                try:
-                    hass.async_run_hass_job(job, event)
-                except Exception:  # pylint: disable=broad-except
-                    _LOGGER.exception(
-                        "Error while processing state changed for %s", entity_id
-                    )
-
-        hass.data[TRACK_STATE_CHANGE_LISTENER] = hass.bus.async_listen(
-            EVENT_STATE_CHANGED, _async_state_change_dispatcher
-        )
-
-    job = HassJob(action)
-
-    for entity_id in entity_ids:
-        entity_callbacks.setdefault(entity_id, []).append(job)
-
-    @callback
-    def remove_listener() -> None:
-        """Remove state change listener."""
-        _async_remove_indexed_listeners(
-            hass,
-            TRACK_STATE_CHANGE_CALLBACKS,
-            TRACK_STATE_CHANGE_LISTENER,
-            entity_ids,
-            job,
-        )
-
-    return remove_listener
+    return hass.bus.async_listen_keyed(
+        EVENT_STATE_CHANGED, ATTR_ENTITY_ID, entity_ids, action
+    )
 
 
 @callback
@@ -328,14 +285,17 @@ def async_track_entity_registry_updated_event(
 
     if TRACK_ENTITY_REGISTRY_UPDATED_LISTENER not in hass.data:
 
+        @callback
+        def _async_entity_registry_updated_filter(event: Event) -> bool:
+            """Filter entity registry updates by entity_id."""
+            entity_id = event.data.get("old_entity_id", event.data["entity_id"])
+            return entity_id in entity_callbacks
+
         @callback
         def _async_entity_registry_updated_dispatcher(event: Event) -> None:
             """Dispatch entity registry updates by entity_id."""
             entity_id = event.data.get("old_entity_id", event.data["entity_id"])
 
-            if entity_id not in entity_callbacks:
-                return
-
             for job in entity_callbacks[entity_id][:]:
                 try:
                     hass.async_run_hass_job(job, event)
@@ -346,7 +306,9 @@ def async_track_entity_registry_updated_event(
                     )
 
         hass.data[TRACK_ENTITY_REGISTRY_UPDATED_LISTENER] = hass.bus.async_listen(
-            EVENT_ENTITY_REGISTRY_UPDATED, _async_entity_registry_updated_dispatcher
+            EVENT_ENTITY_REGISTRY_UPDATED,
+            _async_entity_registry_updated_dispatcher,
+            event_filter=_async_entity_registry_updated_filter,
         )
 
     job = HassJob(action)
@@ -368,15 +330,20 @@ def async_track_entity_registry_updated_event(
     return remove_listener
 
 
+@callback
+def _async_domain_event_wanted(event: Event, callbacks: Dict[str, List]) -> bool:
+    """Check if any domain callback is interested in a state change event."""
+    return (
+        MATCH_ALL in callbacks
+        or split_entity_id(event.data["entity_id"])[0] in callbacks
+    )
+
+
 @callback
 def _async_dispatch_domain_event(
     hass: HomeAssistant, event: Event, callbacks: Dict[str, List]
 ) -> None:
     domain = split_entity_id(event.data["entity_id"])[0]
-
-    if domain not in callbacks and MATCH_ALL not in callbacks:
-        return
-
     listeners = callbacks.get(domain, []) + callbacks.get(MATCH_ALL, [])
 
     for job in listeners:
@@ -404,15 +371,21 @@ def async_track_state_added_domain(
     if TRACK_STATE_ADDED_DOMAIN_LISTENER not in hass.data:
 
         @callback
-        def _async_state_change_dispatcher(event: Event) -> None:
-            """Dispatch state changes by entity_id."""
-            if event.data.get("old_state") is not None:
-                return
+        def _async_state_change_filter(event: Event) -> bool:
+            """Filter state changes by domain."""
+            return event.data.get("old_state") is None and _async_domain_event_wanted(
+                event, domain_callbacks
+            )
 
+        @callback
+        def _async_state_change_dispatcher(event: Event) -> None:
+            """Dispatch state changes by domain."""
             _async_dispatch_domain_event(hass, event, domain_callbacks)
 
         hass.data[TRACK_STATE_ADDED_DOMAIN_LISTENER] = hass.bus.async_listen(
-            EVENT_STATE_CHANGED, _async_state_change_dispatcher
+            EVENT_STATE_CHANGED,
+            _async_state_change_dispatcher,
+            event_filter=_async_state_change_filter,
         )
 
     job = HassJob(action)
@@ -450,15 +423,21 @@ def async_track_state_removed_domain(
     if TRACK_STATE_REMOVED_DOMAIN_LISTENER not in hass.data:
 
         @callback
-        def _async_state_change_dispatcher(event: Event) -> None:
-            """Dispatch state changes by entity_id."""
-            if event.data.get("new_state") is not None:
-                return
+        def _async_state_change_filter(event: Event) -> bool:
+            """Filter state changes by domain."""
+            return event.data.get("new_state") is None and _async_domain_event_wanted(
+                event, domain_callbacks
+            )
 
+        @callback
+        def _async_state_change_dispatcher(event: Event) -> None:
+            """Dispatch state changes by domain."""
             _async_dispatch_domain_event(hass, event, domain_callbacks)
 
         hass.data[TRACK_STATE_REMOVED_DOMAIN_LISTENER] = hass.bus.async_listen(
-            EVENT_STATE_CHANGED, _async_state_change_dispatcher
+            EVENT_STATE_CHANGED,
+            _async_state_change_dispatcher,
+            event_filter=_async_state_change_filter,
         )
 
     job = HassJob(action)
@@ -753,6 +732,8 @@ class _TrackTemplateResultInfo:
         self._info: Dict[Template, RenderInfo] = {}
         self._track_state_changes: Optional[_TrackStateChangeFiltered] = None
         self._time_listeners: Dict[Template, Callable] = {}
+        self._render_cache_hits = 0
+        self._render_cache_misses = 0
 
     def async_setup(self, raise_on_template_error: bool) -> None:
         """Activation of template tracking."""
@@ -789,6 +770,14 @@ class _TrackTemplateResultInfo:
             "time": bool(self._time_listeners),
         }
 
+    @property
+    def render_cache_stats(self) -> Dict[str, int]:
+        """Return how often a render was skipped (hits) or done (misses)."""
+        return {
+            "hits": self._render_cache_hits,
+            "misses": self._render_cache_misses,
+        }
+
     @callback
     def _setup_time_listener(self, template: Template, has_time: bool) -> None:
         if not has_time:
@@ -876,10 +865,18 @@ class _TrackTemplateResultInfo:
                 event,
             )
 
-        self._rate_limit.async_triggered(template, now)
-        self._info[template] = info = template.async_render_to_info(
-            track_template_.variables
-        )
+        info = self._info[template]
+        if info.inputs_unchanged():
+            # Rendering again would read the same states and give the same result
+            self._render_cache_hits += 1
+            rendered = False
+        else:
+            self._render_cache_misses += 1
+            rendered = True
+            self._rate_limit.async_triggered(template, now)
+            self._info[template] = info = template.async_render_to_info(
+                track_template_.variables
+            )
 
         try:
             result: Union[str, TemplateError] = info.result()
@@ -890,10 +887,10 @@ class _TrackTemplateResultInfo:
 
         # Check to see if the result has changed
         if result == last_result:
-            return True
+            return rendered
 
         if isinstance(result, TemplateError) and isinstance(last_result, TemplateError):
-            return True
+            return rendered
 
         return TrackTemplateResult(template, last_result, result)
 
@@ -1329,17 +1326,8 @@ def async_track_utc_time_change(
     """Add a listener that will fire if time matches a pattern."""
 
     job = HassJob(action)
-    # We do not have to wrap the function with time pattern matching logic
-    # if no pattern given
-    if all(val is None for val in (hour, minute, second)):
-
-        @callback
-        def time_change_listener(event: Event) -> None:
-            """Fire every time event that comes in."""
-            hass.async_run_hass_job(job, event.data[ATTR_NOW])
-
-        return hass.bus.async_listen(EVENT_TIME_CHANGED, time_change_listener)
-
+    # Patterns are turned into deadlines on the event loop. Without a pattern
+    # every second matches.
     matching_seconds = dt_util.parse_time_expression(second, 0, 59)
     matching_minutes = dt_util.parse_time_expression(minute, 0, 59)
     matching_hours = dt_util.parse_time_expression(hour, 0, 23)
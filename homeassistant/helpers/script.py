@@ -773,6 +773,60 @@ def _referenced_extract_ids(data: Dict, key: str, found: Set[str]) -> None:
         found.add(item_id)
 
 
+class ReferenceIndex:
+    """Index of the entities and devices referenced by script entities.
+
+    Maps each referenced entity and device to the entity ids of the
+    automations or scripts that reference them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        # Dicts are used as insertion ordered sets
+        self._entities: Dict[str, Dict[str, None]] = {}
+        self._devices: Dict[str, Dict[str, None]] = {}
+        self._references: Dict[str, Tuple[Set[str], Set[str]]] = {}
+
+    @callback
+    def async_add(self, entity_id: str, entities: Set[str], devices: Set[str]) -> None:
+        """Add the references of an entity, replacing existing ones."""
+        self.async_remove(entity_id)
+        entities = set(entities)
+        devices = set(devices)
+        self._references[entity_id] = (entities, devices)
+        for referenced_id in entities:
+            self._entities.setdefault(referenced_id, {})[entity_id] = None
+        for referenced_id in devices:
+            self._devices.setdefault(referenced_id, {})[entity_id] = None
+
+    @callback
+    def async_remove(self, entity_id: str) -> None:
+        """Remove the references of an entity."""
+        references = self._references.pop(entity_id, None)
+        if references is None:
+            return
+        entities, devices = references
+        for index, referenced_ids in (
+            (self._entities, entities),
+            (self._devices, devices),
+        ):
+            for referenced_id in referenced_ids:
+                referencing = index[referenced_id]
+                del referencing[entity_id]
+                if not referencing:
+                    del index[referenced_id]
+
+    @callback
+    def async_referencing_entity(self, entity_id: str) -> List[str]:
+        """Return the entity ids that reference an entity."""
+        return list(self._entities.get(entity_id, ()))
+
+    @callback
+    def async_referencing_device(self, device_id: str) -> List[str]:
+        """Return the entity ids that reference a device."""
+        return list(self._devices.get(device_id, ()))
+
+
 class Script:
     """Representation of a script."""
 
@@ -3,6 +3,7 @@ from ast import literal_eval
 import asyncio
 import base64
 import collections.abc
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from functools import partial, wraps
 import json
@@ -11,14 +12,14 @@ import math
 from operator import attrgetter
 import random
 import re
-from typing import Any, Dict, Generator, Iterable, Optional, Type, Union, cast
+import threading
+from typing import Any, Dict, Generator, Iterable, List, Optional, Type, Union, cast
 from urllib.parse import urlencode as urllib_urlencode
-import weakref
 
 import jinja2
 from jinja2 import contextfilter, contextfunction
 from jinja2.sandbox import ImmutableSandboxedEnvironment
-from jinja2.utils import Namespace  # type: ignore
+from jinja2.utils import LRUCache, Namespace  # type: ignore
 import voluptuous as vol
 
 from homeassistant.const import (
@@ -26,17 +27,18 @@ from homeassistant.const import (
     ATTR_LATITUDE,
     ATTR_LONGITUDE,
     ATTR_UNIT_OF_MEASUREMENT,
+    EVENT_HOMEASSISTANT_CLOSE,
     LENGTH_METERS,
     STATE_UNKNOWN,
 )
-from homeassistant.core import State, callback, split_entity_id, valid_entity_id
+from homeassistant.core import Event, State, callback, split_entity_id, valid_entity_id
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers import location as loc_helper
 from homeassistant.helpers.typing import HomeAssistantType, TemplateVarsType
 from homeassistant.loader import bind_hass
 from homeassistant.util import convert, dt as dt_util, location as loc_util
 from homeassistant.util.async_ import run_callback_threadsafe
-from homeassistant.util.thread import ThreadWithException
+from homeassistant.util.thread import ThreadWithException, raise_in_thread
 
 # mypy: allow-untyped-defs, no-check-untyped-defs
 
@@ -46,6 +48,7 @@ DATE_STR_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 _RENDER_INFO = "template.render_info"
 _ENVIRONMENT = "template.environment"
+_WORKER_POOL = "template.worker_pool"
 
 _RE_JINJA_DELIMITERS = re.compile(r"\{%|\{\{|\{#")
 # Match "simple" ints and floats. -1.0, 1, +5, 5.0
@@ -69,6 +72,12 @@ _COLLECTABLE_STATE_ATTRIBUTES = {
 ALL_STATES_RATE_LIMIT = timedelta(minutes=1)
 DOMAIN_STATES_RATE_LIMIT = timedelta(seconds=1)
 
+# Number of template sources with cached compiled code per environment
+TEMPLATE_CACHE_SIZE = 1024
+
+# Number of threads rendering templates off the event loop
+TEMPLATE_WORKERS = 2
+
 
 @bind_hass
 def attach(hass: HomeAssistantType, obj: Any) -> None:
@@ -117,6 +126,54 @@ def is_template_string(maybe_template: str) -> bool:
     return _RE_JINJA_DELIMITERS.search(maybe_template) is not None
 
 
+async def async_precompile_templates(hass: HomeAssistantType, config: Any) -> None:
+    """Compile the template strings of a configuration in the executor.
+
+    Validating and rendering the templates then takes their compiled code
+    from the caches instead of compiling it on the event loop.
+    """
+    await hass.async_add_executor_job(
+        _precompile_templates, _get_environment(hass), config
+    )
+
+
+def _precompile_templates(env: "TemplateEnvironment", config: Any) -> None:
+    """Compile the template strings of a configuration."""
+    sources = {
+        source.strip()
+        for source in _iter_config_strings(config)
+        if is_template_string(source)
+    }
+    for source in list(sources)[:TEMPLATE_CACHE_SIZE]:
+        try:
+            # Configuration is validated without hass and rendered with it
+            _NO_HASS_ENV.compile(source)
+            env.from_source(source)
+        except jinja2.TemplateError:
+            # Reported when the configuration is validated
+            continue
+
+
+def _iter_config_strings(config: Any) -> Generator[str, None, None]:
+    """Yield the strings in the values of a configuration."""
+    if isinstance(config, str):
+        yield config
+    elif isinstance(config, list):
+        for item in config:
+            yield from _iter_config_strings(item)
+    elif isinstance(config, collections.abc.Mapping):
+        for value in config.values():
+            yield from _iter_config_strings(value)
+
+
+def _get_environment(hass: HomeAssistantType) -> "TemplateEnvironment":
+    """Return the template environment of a hass instance."""
+    env: Optional[TemplateEnvironment] = hass.data.get(_ENVIRONMENT)
+    if env is None:
+        env = hass.data[_ENVIRONMENT] = TemplateEnvironment(hass)  # type: ignore[no-untyped-call]
+    return env
+
+
 class ResultWrapper:
     """Result wrapper class to store render result."""
 
@@ -205,6 +262,13 @@ class RenderInfo:
         self.entities = set()
         self.rate_limit: Optional[timedelta] = None
         self.has_time = False
+        # The result can change without any state changing, e.g. random values
+        self.is_volatile = False
+        # The entity states the result depends on, None when it depends on
+        # more than these states. A change replaces the state object, so
+        # the objects are versions of the states even when two changes
+        # share a last_updated.
+        self.entity_versions: Optional[Dict[str, Optional[State]]] = None
 
     def __repr__(self) -> str:
         """Representation of RenderInfo."""
@@ -230,18 +294,49 @@ class RenderInfo:
             raise self.exception
         return cast(str, self._result)
 
+    def inputs_unchanged(self) -> bool:
+        """Return if none of the states the result depends on changed."""
+        if self.entity_versions is None:
+            return False
+        states = self.template.hass.states
+        for entity_id, state in self.entity_versions.items():
+            if states.get(entity_id) is not state:
+                return False
+        return True
+
     def _freeze_static(self) -> None:
         self.is_static = True
         self._freeze_sets()
         self.all_states = False
+        self.entity_versions = {}
+
+    def _record_entity_versions(self, states: Any) -> None:
+        """Record the versions of the states read if they are the only inputs."""
+        if (
+            self.exception
+            or self.all_states
+            or self.all_states_lifecycle
+            or self.domains
+            or self.domains_lifecycle
+            or self.has_time
+            or self.is_volatile
+        ):
+            return
+
+        self.entity_versions = {}
+        for entity_id in self.entities:
+            self.entity_versions[entity_id] = states.get(entity_id)
 
     def _freeze_sets(self) -> None:
         self.entities = frozenset(self.entities)
         self.domains = frozenset(self.domains)
         self.domains_lifecycle = frozenset(self.domains_lifecycle)
 
-    def _freeze(self) -> None:
+    def _freeze(self, states: Any = None) -> None:
         self._freeze_sets()
+        self._record_entity_versions(
+            self.template.hass.states if states is None else states
+        )
 
         if self.rate_limit is None:
             if self.all_states or self.exception:
@@ -296,10 +391,7 @@ class Template:
     def _env(self) -> "TemplateEnvironment":
         if self.hass is None:
             return _NO_HASS_ENV
-        ret: Optional[TemplateEnvironment] = self.hass.data.get(_ENVIRONMENT)
-        if ret is None:
-            ret = self.hass.data[_ENVIRONMENT] = TemplateEnvironment(self.hass)  # type: ignore[no-untyped-call]
-        return ret
+        return _get_environment(self.hass)
 
     def ensure_valid(self) -> None:
         """Return if template is valid."""
@@ -442,6 +534,30 @@ class Template:
 
         return False
 
+    async def async_render_to_info_in_worker(
+        self, timeout: float, variables: TemplateVarsType = None, **kwargs: Any
+    ) -> RenderInfo:
+        """Render the template in a worker thread and collect an entity filter.
+
+        The template is rendered against a snapshot of the states, so an
+        expensive template does not block the event loop. A render that
+        does not finish within timeout seconds is interrupted and its
+        render info holds a TemplateError.
+
+        This method must be run in the event loop.
+        """
+        assert self.hass
+
+        if self.is_static:
+            return self.async_render_to_info(variables, **kwargs)
+
+        if variables is not None:
+            kwargs.update(variables)
+
+        return await _async_get_worker_pool(self.hass).async_render_to_info(
+            self, kwargs, timeout
+        )
+
     @callback
     def async_render_to_info(
         self, variables: TemplateVarsType = None, **kwargs: Any
@@ -525,12 +641,8 @@ class Template:
 
         assert self.hass is not None, "hass variable not set on template"
 
-        env = self._env
-
-        self._compiled = cast(
-            Template,
-            jinja2.Template.from_code(env, self._compiled_code, env.globals, None),
-        )
+        # Identical templates share the compiled template of their source
+        self._compiled = cast(Template, self._env.from_source(self.template))
 
         return self._compiled
 
@@ -1015,6 +1127,12 @@ def utcnow(hass):
     return dt_util.utcnow()
 
 
+def _collect_volatile(hass: HomeAssistantType) -> None:
+    render_info = hass.data.get(_RENDER_INFO)
+    if render_info is not None:
+        render_info.is_volatile = True
+
+
 def forgiving_round(value, precision=0, method="common"):
     """Round accepted strings."""
     try:
@@ -1299,7 +1417,8 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
         """Initialise template environment."""
         super().__init__()
         self.hass = hass
-        self.template_cache = weakref.WeakValueDictionary()
+        self.template_cache = LRUCache(TEMPLATE_CACHE_SIZE)
+        self.compiled_cache = LRUCache(TEMPLATE_CACHE_SIZE)
         self.filters["round"] = forgiving_round
         self.filters["multiply"] = multiply
         self.filters["log"] = logarithm
@@ -1367,6 +1486,20 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
 
             return contextfunction(wrapper)
 
+        # Results of these functions can change between two renders
+        # of a template even if no state changed
+        def volatilefunction(func):
+            """Wrap function that does not only depend on its arguments."""
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                _collect_volatile(hass)
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        self.globals["relative_time"] = volatilefunction(relative_time)
+        self.filters["random"] = volatilefunction(random_every_time)
         self.globals["expand"] = hassfunction(expand)
         self.filters["expand"] = contextfilter(self.globals["expand"])
         self.globals["closest"] = hassfunction(closest)
@@ -1413,5 +1546,198 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
 
         return cached
 
+    def from_source(self, source: str) -> jinja2.Template:
+        """Return the template compiled from a source, shared by identical templates."""
+        compiled = self.compiled_cache.get(source)
+
+        if compiled is None:
+            compiled = self.compiled_cache[source] = jinja2.Template.from_code(
+                self, self.compile(source), self.globals, None
+            )
+
+        return compiled
+
 
 _NO_HASS_ENV = TemplateEnvironment(None)  # type: ignore[no-untyped-call]
+
+
+class _StatesSnapshot:
+    """Immutable snapshot of the state machine for renders in the workers."""
+
+    __slots__ = ("_states",)
+
+    def __init__(self, states: Iterable[State]) -> None:
+        """Initialize the snapshot."""
+        self._states = {state.entity_id: state for state in states}
+
+    def get(self, entity_id: str) -> Optional[State]:
+        """Retrieve state of entity_id or None if not found."""
+        return self._states.get(entity_id.lower())
+
+    def async_all(self, domain_filter: Optional[str] = None) -> List[State]:
+        """Create a list of all states matching the filter."""
+        if domain_filter is None:
+            return list(self._states.values())
+
+        domain_filter = domain_filter.lower()
+        return [
+            state for state in self._states.values() if state.domain == domain_filter
+        ]
+
+    def async_entity_ids_count(self, domain_filter: Optional[str] = None) -> int:
+        """Count the entity ids matching the filter."""
+        if domain_filter is None:
+            return len(self._states)
+
+        return len(self.async_all(domain_filter))
+
+
+class _WorkerHass:
+    """Stand-in for hass in the templates rendered by the workers.
+
+    Each worker thread sees its own snapshot of the states and collects
+    its own render info.
+    """
+
+    def __init__(self, hass: HomeAssistantType) -> None:
+        """Initialize the stand-in."""
+        self.config = hass.config
+        self._local = threading.local()
+
+    @property
+    def states(self) -> _StatesSnapshot:
+        """Return the states snapshot of the current render."""
+        return cast(_StatesSnapshot, self._local.states)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Return the data of the current render."""
+        return cast(Dict[str, Any], self._local.data)
+
+    def set_render(
+        self, states: Optional[_StatesSnapshot], data: Optional[Dict[str, Any]]
+    ) -> None:
+        """Set the snapshot and data of the render in the current thread."""
+        self._local.states = states
+        self._local.data = data
+
+
+class _RenderJob:
+    """A render in a worker thread that can be interrupted from the loop."""
+
+    def __init__(self) -> None:
+        """Initialize the job."""
+        self._lock = threading.Lock()
+        self._thread_id: Optional[int] = None
+        self._interrupted = False
+
+    def __enter__(self) -> None:
+        """Mark the current thread as running the render."""
+        with self._lock:
+            if self._interrupted:
+                raise TimeoutError
+            self._thread_id = threading.get_ident()
+
+    def __exit__(self, *args: Any) -> None:
+        """Mark the render as done."""
+        with self._lock:
+            self._thread_id = None
+
+    def interrupt(self) -> None:
+        """Interrupt the render if it did not finish yet."""
+        with self._lock:
+            self._interrupted = True
+            # Only raise while the render runs, the thread
+            # may already be running another render
+            if self._thread_id is not None:
+                raise_in_thread(self._thread_id, TimeoutError)
+
+
+class _TemplateWorkerPool:
+    """Threads rendering templates off the event loop."""
+
+    def __init__(self, hass: HomeAssistantType) -> None:
+        """Initialize the pool."""
+        self.hass = hass
+        self._worker_hass = _WorkerHass(hass)
+        self._env = TemplateEnvironment(self._worker_hass)  # type: ignore[no-untyped-call]
+        self._executor = ThreadPoolExecutor(
+            max_workers=TEMPLATE_WORKERS, thread_name_prefix="TemplateWorker"
+        )
+
+    async def async_render_to_info(
+        self, template: Template, variables: Dict[str, Any], timeout: float
+    ) -> RenderInfo:
+        """Render a template in a worker, interrupt it after timeout seconds."""
+        job = _RenderJob()
+        future = self.hass.loop.run_in_executor(
+            self._executor,
+            self._render_to_info,
+            job,
+            template,
+            variables,
+            self.hass.states.async_all(),
+        )
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            job.interrupt()
+
+        render_info = RenderInfo(template)  # type: ignore[no-untyped-call]
+        render_info.exception = TemplateError(  # type: ignore[no-untyped-call]
+            f"Exceeded maximum execution time of {timeout}s"
+        )
+        render_info._freeze()  # pylint: disable=protected-access
+        return render_info
+
+    def _render_to_info(
+        self,
+        job: _RenderJob,
+        template: Template,
+        variables: Dict[str, Any],
+        states: List[State],
+    ) -> Optional[RenderInfo]:
+        """Render a template against a snapshot of the states.
+
+        This method runs in a worker thread.
+        """
+        # pylint: disable=protected-access
+        render_info = RenderInfo(template)  # type: ignore[no-untyped-call]
+        snapshot = _StatesSnapshot(states)
+        self._worker_hass.set_render(snapshot, {_RENDER_INFO: render_info})
+
+        try:
+            with job:
+                try:
+                    compiled = self._env.from_source(template.template)
+                    result = compiled.render(variables).strip()
+                except TimeoutError:
+                    raise
+                except Exception as err:  # pylint: disable=broad-except
+                    render_info.exception = TemplateError(err)  # type: ignore[no-untyped-call]
+                else:
+                    if not self.hass.config.legacy_templates:
+                        result = template._parse_result(result)
+                    render_info._result = result
+        except TimeoutError:
+            # The loop gave up on the render
+            return None
+        finally:
+            self._worker_hass.set_render(None, None)
+
+        render_info._freeze(snapshot)
+        return render_info
+
+    async def async_shutdown(self, event: Event) -> None:
+        """Shut down the worker threads."""
+        await self.hass.async_add_executor_job(self._executor.shutdown)
+
+
+def _async_get_worker_pool(hass: HomeAssistantType) -> _TemplateWorkerPool:
+    """Return the template worker pool, start it if needed."""
+    pool: Optional[_TemplateWorkerPool] = hass.data.get(_WORKER_POOL)
+    if pool is None:
+        pool = hass.data[_WORKER_POOL] = _TemplateWorkerPool(hass)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, pool.async_shutdown)
+    return pool
@@ -9,23 +9,28 @@ import functools as ft
 import importlib
 import json
 import logging
+import os
 import pathlib
 import sys
+from time import monotonic
 from types import ModuleType
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
     Dict,
+    Iterable,
     List,
     Optional,
     Set,
+    Tuple,
     TypedDict,
     TypeVar,
     Union,
     cast,
 )
 
+from homeassistant.const import __version__
 from homeassistant.generated.dhcp import DHCP
 from homeassistant.generated.mqtt import MQTT
 from homeassistant.generated.ssdp import SSDP
@@ -46,6 +51,8 @@ _LOGGER = logging.getLogger(__name__)
 DATA_COMPONENTS = "components"
 DATA_INTEGRATIONS = "integrations"
 DATA_CUSTOM_COMPONENTS = "custom_components"
+DATA_PRELOADS = "integration_preloads"
+DATA_INTEGRATION_INDEX = "integration_index"
 PACKAGE_CUSTOM_COMPONENTS = "custom_components"
 PACKAGE_BUILTIN = "homeassistant.components"
 CUSTOM_WARNING = (
@@ -58,6 +65,9 @@ _UNDEF = object()  # Internal; not helpers.typing.UNDEFINED due to circular depe
 
 MAX_LOAD_CONCURRENTLY = 4
 
+INTEGRATION_INDEX_STORAGE_KEY = "core.integration_index"
+INTEGRATION_INDEX_STORAGE_VERSION = 1
+
 
 class Manifest(TypedDict, total=False):
     """
@@ -109,25 +119,27 @@ async def _async_get_custom_components(
     except ImportError:
         return {}
 
-    def get_sub_directories(paths: List[str]) -> List[pathlib.Path]:
-        """Return all sub directories in a set of paths."""
+    def get_sub_directories(paths: List[str]) -> List[str]:
+        """Return the names of all sub directories in a set of paths."""
         return [
-            entry
+            entry.name
             for path in paths
             for entry in pathlib.Path(path).iterdir()
             if entry.is_dir()
         ]
 
-    dirs = await hass.async_add_executor_job(
-        get_sub_directories, custom_components.__path__
-    )
+    index = await _async_get_integration_index(hass)
+    dirs = index.custom_dirs
+    if dirs is None:
+        dirs = index.custom_dirs = await hass.async_add_executor_job(
+            get_sub_directories, custom_components.__path__
+        )
+        index.dirty = True
 
     integrations = await asyncio.gather(
         *(
-            hass.async_add_executor_job(
-                Integration.resolve_from_root, hass, custom_components, comp.name
-            )
-            for comp in dirs
+            _async_resolve_from_root(hass, index, custom_components, name)
+            for name in dirs
         )
     )
 
@@ -520,8 +532,8 @@ async def async_get_integration(hass: "HomeAssistant", domain: str) -> Integrati
 
     from homeassistant import components  # pylint: disable=import-outside-toplevel
 
-    integration = await hass.async_add_executor_job(
-        Integration.resolve_from_root, hass, components, domain
+    integration = await _async_resolve_from_root(
+        hass, await _async_get_integration_index(hass), components, domain
     )
 
     if integration is not None:
@@ -544,6 +556,288 @@ async def async_get_integration(hass: "HomeAssistant", domain: str) -> Integrati
     return integration
 
 
+async def async_preload_integrations(
+    hass: "HomeAssistant", integrations: Iterable[Integration], platforms: Set[str]
+) -> Dict[str, float]:
+    """Import integrations and their platforms in the executor.
+
+    An integration is imported once its dependencies are, integrations
+    that do not depend on each other are imported in parallel. Of the
+    platforms only the ones the integration has are imported.
+
+    Import errors are ignored, setting up the integration reports them.
+    Returns the seconds it took to import each integration.
+    """
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.requirements import async_get_integration_with_requirements
+
+    preloads: Dict[str, asyncio.Task] = hass.data.setdefault(DATA_PRELOADS, {})
+    cache = hass.data.setdefault(DATA_COMPONENTS, {})
+    import_times: Dict[str, float] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def _async_preload(integration: Integration) -> None:
+        """Import an integration after its dependencies."""
+        domain = integration.domain
+        try:
+            for dependency in integration.dependencies:
+                if dependency in tasks:
+                    await tasks[dependency]
+
+            # Import with the requirements the integration will be set up with
+            await async_get_integration_with_requirements(hass, domain)
+            import_times[domain] = await hass.async_add_executor_job(
+                _import_integration,
+                integration,
+                [
+                    platform
+                    for platform in platforms
+                    if f"{domain}.{platform}" not in cache
+                ],
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Unable to preload %s: %s", domain, err)
+        finally:
+            preloads.pop(domain, None)
+
+    # Mocked or already imported integrations have nothing to preload,
+    # integrations with unresolved dependencies fail to set up
+    to_preload = [
+        integration
+        for integration in integrations
+        if integration.file_path is not None
+        and integration.domain not in cache
+        and integration.domain not in preloads
+    ]
+    to_preload = [
+        integration
+        for integration in to_preload
+        if await integration.resolve_dependencies()
+    ]
+
+    for integration in to_preload:
+        tasks[integration.domain] = preloads[
+            integration.domain
+        ] = hass.async_create_task(_async_preload(integration))
+
+    if tasks:
+        await asyncio.wait(tasks.values())
+
+    for domain, import_time in sorted(
+        import_times.items(), key=lambda item: item[1], reverse=True
+    ):
+        _LOGGER.debug("Imported %s in %.3f seconds", domain, import_time)
+
+    return import_times
+
+
+async def async_wait_preloaded(hass: "HomeAssistant", domain: str) -> None:
+    """Wait until an integration that is being preloaded is imported."""
+    preload = hass.data.get(DATA_PRELOADS, {}).get(domain)
+    if preload is not None:
+        await asyncio.shield(preload)
+
+
+def _import_integration(integration: Integration, platforms: List[str]) -> float:
+    """Import an integration and the platforms it has.
+
+    This method needs to run in an executor.
+    """
+    start = monotonic()
+    importlib.import_module(integration.pkg_path)
+
+    for platform in platforms:
+        if (integration.file_path / f"{platform}.py").is_file() or (
+            integration.file_path / platform / "__init__.py"
+        ).is_file():
+            try:
+                importlib.import_module(f"{integration.pkg_path}.{platform}")
+            except Exception:  # pylint: disable=broad-except
+                continue
+
+    return monotonic() - start
+
+
+class _IntegrationIndex:
+    """Index of the manifests of the integrations resolved on earlier starts.
+
+    Entries are keyed on the package path of the integration and hold the
+    mtime of the manifest they were read from. The index is only used with
+    the Home Assistant version that wrote it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the index."""
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Sub directories of custom_components, None if they can have changed
+        self.custom_dirs: Optional[List[str]] = None
+        self.custom_roots: Dict[str, float] = {}
+        self.dirty = False
+
+    def get(
+        self, hass: "HomeAssistant", root_module: ModuleType, domain: str
+    ) -> Optional["Integration"]:
+        """Return an integration from the index."""
+        entry = self.entries.get(f"{root_module.__name__}.{domain}")
+        if entry is None:
+            return None
+        return Integration(
+            hass,
+            f"{root_module.__name__}.{domain}",
+            pathlib.Path(entry["file_path"]),
+            dict(entry["manifest"]),  # type: ignore
+        )
+
+    def add(self, integration: "Integration", mtime: float) -> None:
+        """Add an integration resolved from its manifest to the index."""
+        manifest = dict(integration.manifest)
+        manifest.pop("is_built_in", None)
+        self.entries[integration.pkg_path] = {
+            "file_path": str(integration.file_path),
+            "mtime": mtime,
+            "manifest": manifest,
+        }
+        self.dirty = True
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the index to store."""
+        return {
+            "ha_version": __version__,
+            "custom_roots": self.custom_roots,
+            "custom_dirs": self.custom_dirs,
+            "entries": self.entries,
+        }
+
+
+def _validate_integration_index(
+    data: Optional[Dict[str, Any]], custom_roots: List[str]
+) -> _IntegrationIndex:
+    """Return the entries of a stored index that are still valid.
+
+    This method needs to run in an executor.
+    """
+    index = _IntegrationIndex()
+    index.custom_roots = {}
+    for root in custom_roots:
+        try:
+            index.custom_roots[root] = os.stat(root).st_mtime
+        except OSError:
+            continue
+
+    if not data or data.get("ha_version") != __version__:
+        index.dirty = True
+        return index
+
+    # Adding or removing a custom integration changes the mtime of the root
+    if data["custom_roots"] == index.custom_roots:
+        index.custom_dirs = data["custom_dirs"]
+    else:
+        index.dirty = True
+
+    for pkg_path, entry in data["entries"].items():
+        try:
+            mtime = os.stat(os.path.join(entry["file_path"], "manifest.json")).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == entry["mtime"]:
+            index.entries[pkg_path] = entry
+        else:
+            index.dirty = True
+
+    return index
+
+
+async def _async_get_integration_index(hass: "HomeAssistant") -> _IntegrationIndex:
+    """Return the integration index, load it if needed."""
+    index_or_evt = hass.data.get(DATA_INTEGRATION_INDEX)
+
+    if isinstance(index_or_evt, _IntegrationIndex):
+        return index_or_evt
+
+    if isinstance(index_or_evt, asyncio.Event):
+        await index_or_evt.wait()
+        return cast(_IntegrationIndex, hass.data[DATA_INTEGRATION_INDEX])
+
+    evt = hass.data[DATA_INTEGRATION_INDEX] = asyncio.Event()
+
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.helpers.storage import Store
+
+    custom_roots = []
+    if not hass.config.safe_mode and hass.config.config_dir is not None:
+        custom_roots.append(hass.config.path(PACKAGE_CUSTOM_COMPONENTS))
+
+    try:
+        data = await Store(
+            hass, INTEGRATION_INDEX_STORAGE_VERSION, INTEGRATION_INDEX_STORAGE_KEY
+        ).async_load()
+    except Exception as err:  # pylint: disable=broad-except
+        _LOGGER.warning("Unable to load the integration index: %s", err)
+        data = None
+
+    index = await hass.async_add_executor_job(
+        _validate_integration_index, data, custom_roots
+    )
+    hass.data[DATA_INTEGRATION_INDEX] = index
+    evt.set()
+    return index
+
+
+async def async_save_integration_index(hass: "HomeAssistant") -> None:
+    """Store the integration index if integrations were resolved from disk."""
+    index = hass.data.get(DATA_INTEGRATION_INDEX)
+    if not isinstance(index, _IntegrationIndex) or not index.dirty:
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.helpers.storage import Store
+
+    index.dirty = False
+    await Store(
+        hass, INTEGRATION_INDEX_STORAGE_VERSION, INTEGRATION_INDEX_STORAGE_KEY
+    ).async_save(index.as_dict())
+
+
+async def _async_resolve_from_root(
+    hass: "HomeAssistant",
+    index: _IntegrationIndex,
+    root_module: ModuleType,
+    domain: str,
+) -> Optional[Integration]:
+    """Resolve an integration from the index or from a root module."""
+    integration = index.get(hass, root_module, domain)
+    if integration is not None:
+        return integration
+
+    integration, mtime = await hass.async_add_executor_job(
+        _resolve_from_root_with_mtime, hass, root_module, domain
+    )
+    if integration is not None and mtime is not None:
+        index.add(integration, mtime)
+    return integration
+
+
+def _resolve_from_root_with_mtime(
+    hass: "HomeAssistant", root_module: ModuleType, domain: str
+) -> Tuple[Optional[Integration], Optional[float]]:
+    """Resolve an integration and return the mtime of its manifest.
+
+    The mtime is read before the manifest, so an index entry is never
+    newer than its mtime.
+
+    This method needs to run in an executor.
+    """
+    mtime = None
+    for base in root_module.__path__:  # type: ignore
+        try:
+            mtime = os.stat(os.path.join(base, domain, "manifest.json")).st_mtime
+            break
+        except OSError:
+            continue
+
+    return Integration.resolve_from_root(hass, root_module, domain), mtime
+
+
 class LoaderError(Exception):
     """Loader base error."""
 
@@ -6,6 +6,8 @@ from contextlib import suppress
 from datetime import datetime
 import json
 import logging
+import pathlib
+import tempfile
 from timeit import default_timer as timer
 from typing import Callable, Dict, TypeVar
 
@@ -323,6 +325,57 @@ async def json_serialize_states(hass):
     return timer() - start
 
 
+@benchmark
+async def mqtt_subscription_matching(hass):
+    """Match 100k MQTT messages against 10k subscriptions."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.components.mqtt.models import SubscriptionTrie
+
+    trie = SubscriptionTrie()
+    for node in range(10 ** 4 - 3):
+        trie.add(f"home/node_{node}/sensor/state", node)
+    for topic_filter in ("homeassistant/#", "home/+/sensor/state", "home/node_0/#"):
+        trie.add(topic_filter, topic_filter)
+    topics = [f"home/node_{node}/sensor/state" for node in range(10 ** 4)]
+
+    start = timer()
+    for _ in range(10):
+        for topic in topics:
+            trie.match(topic)
+    return timer() - start
+
+
+@benchmark
+async def integration_index(hass):
+    """Resolve all built-in integrations on a cold and a warm start."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant import components, loader
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass.config.config_dir = config_dir
+        domains = [
+            path.name
+            for path in pathlib.Path(components.__path__[0]).iterdir()
+            if (path / "manifest.json").is_file()
+        ]
+
+        async def resolve_all():
+            for key in (loader.DATA_INTEGRATIONS, loader.DATA_INTEGRATION_INDEX):
+                hass.data.pop(key, None)
+            start = timer()
+            await asyncio.gather(
+                *(loader.async_get_integration(hass, domain) for domain in domains)
+            )
+            return timer() - start
+
+        cold = await resolve_all()
+        await loader.async_save_integration_index(hass)
+        warm = await resolve_all()
+
+    print(f"Resolved {len(domains)} integrations cold in {cold}s, warm in {warm}s")
+    return warm
+
+
 def _create_state_changed_event_from_old_new(
     entity_id, event_time_fired, old_state, new_state
 ):
@@ -160,6 +160,10 @@ async def _async_setup_component(
         log_error(str(err), integration.documentation)
         return False
 
+    # Importing the integration on the loop while the preloader imports it
+    # in the executor would block the loop until that import is done
+    await loader.async_wait_preloaded(hass, domain)
+
     # Some integrations fail on import because they call functions incorrectly.
     # So we do it before validating config to catch these errors.
     try:
@@ -22,6 +22,11 @@ def _async_raise(tid: int, exctype: Any) -> None:
     raise SystemError("PyThreadState_SetAsyncExc failed")
 
 
+def raise_in_thread(tid: int, exctype: Any) -> None:
+    """Raise the given exception type in the thread with id tid."""
+    _async_raise(tid, exctype)
+
+
 class ThreadWithException(threading.Thread):
     """A thread class that supports raising exception in the thread from another thread.
 
@@ -1120,6 +1120,28 @@ async def test_extraction_functions(hass):
         "device-in-last",
     }
 
+    with patch(
+        "homeassistant.config.load_yaml_config_file",
+        autospec=True,
+        return_value={
+            automation.DOMAIN: {
+                "alias": "test2",
+                "trigger": {"platform": "event", "event_type": "test_event"},
+                "action": {
+                    "service": "test.script",
+                    "data": {"entity_id": "light.in_second"},
+                },
+            }
+        },
+    ):
+        await hass.services.async_call(automation.DOMAIN, SERVICE_RELOAD, blocking=True)
+
+    assert automation.automations_with_entity(hass, "light.in_both") == []
+    assert automation.automations_with_entity(hass, "light.in_second") == [
+        "automation.test2"
+    ]
+    assert automation.automations_with_device(hass, "device-in-both") == []
+
 
 async def test_logbook_humanify_automation_triggered_event(hass):
     """Test humanifying Automation Trigger event."""
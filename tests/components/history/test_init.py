@@ -268,6 +268,36 @@ class TestComponentHistory(unittest.TestCase):
 
         assert states == hist
 
+    def test_stream_significant_states(self):
+        """Test streaming yields the same states per entity."""
+        zero, four, _ = self.record_states()
+        one_and_half = zero + timedelta(seconds=1.5)
+        for start_time in (zero, one_and_half):
+            hist = history.get_significant_states(
+                self.hass,
+                start_time,
+                four,
+                filters=history.Filters(),
+                minimal_response=True,
+            )
+
+            with recorder.session_scope(hass=self.hass) as session, patch.object(
+                history, "STREAM_BATCH_SIZE", 1
+            ):
+                streamed = {
+                    entity_id: list(states)
+                    for entity_id, states in history.stream_significant_states(
+                        self.hass,
+                        session,
+                        start_time,
+                        four,
+                        filters=history.Filters(),
+                        minimal_response=True,
+                    )
+                }
+
+            assert streamed == hist
+
     def test_get_significant_states_with_initial(self):
         """Test that only significant states are returned.
 
@@ -793,6 +823,85 @@ async def test_fetch_period_api_with_minimal_response(hass, hass_client):
     assert response.status == 200
 
 
+async def test_fetch_period_api_with_stream(hass, hass_client):
+    """Test the fetch period view streams the same history."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow()
+    for state in ("on", "off", "on"):
+        hass.states.async_set("light.kitchen", state)
+        hass.states.async_set("sensor.power", state)
+        await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    response = await client.get(f"/api/history/period/{start.isoformat()}")
+    assert response.status == 200
+    expected = await response.json()
+    assert len(expected) == 2
+
+    with patch.object(history, "STREAM_CHUNK_SIZE", 2):
+        response = await client.get(f"/api/history/period/{start.isoformat()}?stream")
+    assert response.status == 200
+    assert await response.json() == expected
+
+    response = await client.get(
+        f"/api/history/period/{start.isoformat()}?stream&filter_entity_id=light.nomatch"
+    )
+    assert response.status == 200
+    assert await response.json() == []
+
+
+async def test_fetch_period_api_with_downsample(hass, hass_client):
+    """Test the fetch period view serving hourly statistics."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+    start = dt_util.utcnow() - timedelta(days=2)
+    hass.states.async_set("light.kitchen", "on")
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    statistics = {
+        "sensor.power": [
+            {"start": start, "mean": 20.0, "min": 10.0, "max": 30.0, "sum": None}
+        ]
+    }
+    client = await hass_client()
+    with patch(
+        "homeassistant.components.history.statistics_during_period",
+        return_value=statistics,
+    ) as mock_statistics:
+        response = await client.get(
+            f"/api/history/period/{start.isoformat()}?downsample",
+            params={
+                "filter_entity_id": "sensor.power,light.kitchen",
+                "end_time": dt_util.utcnow().isoformat(),
+            },
+        )
+    assert response.status == 200
+    assert mock_statistics.call_args[0][3] == ["sensor.power", "light.kitchen"]
+
+    result = await response.json()
+    assert len(result) == 2
+    power, kitchen = result
+    assert power == [
+        {
+            "entity_id": "sensor.power",
+            "state": "20.0",
+            "attributes": {"min": 10.0, "max": 30.0, "sum": None},
+            "last_changed": start.isoformat(),
+            "last_updated": start.isoformat(),
+            "context": {"id": None, "parent_id": None, "user_id": None},
+        }
+    ]
+    assert kitchen[0]["entity_id"] == "light.kitchen"
+
+
 async def test_fetch_period_api_with_no_timestamp(hass, hass_client):
     """Test the fetch period view for history with no timestamp."""
     await hass.async_add_executor_job(init_recorder_component, hass)
@@ -1621,3 +1621,44 @@ async def test_attribute_if_not_fires_on_entities_change_with_for_after_stop(
     async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=10))
     await hass.async_block_till_done()
     assert len(calls) == 1
+
+
+async def test_many_triggers_share_one_listener(hass, calls):
+    """Test triggers on one entity share a listener and only crossings fire."""
+    hass.states.async_set("test.entity", 0)
+    listeners = hass.bus.async_listeners().get("state_changed", 0)
+
+    assert await async_setup_component(
+        hass,
+        automation.DOMAIN,
+        {
+            automation.DOMAIN: [
+                {
+                    "trigger": {
+                        "platform": "numeric_state",
+                        "entity_id": "test.entity",
+                        "above": threshold,
+                    },
+                    "action": {
+                        "service": "test.automation",
+                        "data": {"threshold": threshold},
+                    },
+                }
+                for threshold in range(0, 100, 10)
+            ]
+        },
+    )
+    await hass.async_block_till_done()
+    assert hass.bus.async_listeners()["state_changed"] == listeners + 1
+
+    hass.states.async_set("test.entity", 25)
+    await hass.async_block_till_done()
+    assert sorted(call.data["threshold"] for call in calls) == [0, 10, 20]
+
+    hass.states.async_set("test.entity", 27)
+    await hass.async_block_till_done()
+    assert len(calls) == 3
+
+    hass.states.async_set("test.entity", 45)
+    await hass.async_block_till_done()
+    assert sorted(call.data["threshold"] for call in calls) == [0, 10, 20, 30, 40]
@@ -39,12 +39,12 @@ from homeassistant.const import (
     ATTR_BATTERY_LEVEL,
     ATTR_ENTITY_ID,
     ATTR_SERVICE,
+    EVENT_STATE_CHANGED,
     STATE_OFF,
     STATE_ON,
     STATE_UNAVAILABLE,
     __version__,
 )
-from homeassistant.helpers.event import TRACK_STATE_CHANGE_CALLBACKS
 import homeassistant.util.dt as dt_util
 
 from tests.common import async_fire_time_changed, async_mock_service
@@ -93,9 +93,14 @@ async def test_accessory_cancels_track_state_change_on_stop(hass, hk_driver):
         "homeassistant.components.homekit.accessories.HomeAccessory.async_update_state"
     ):
         await acc.run_handler()
-    assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS][entity_id]) == 1
+    assert (
+        hass.bus.async_keyed_listeners(EVENT_STATE_CHANGED, ATTR_ENTITY_ID)[entity_id]
+        == 1
+    )
     acc.async_stop()
-    assert entity_id not in hass.data[TRACK_STATE_CHANGE_CALLBACKS]
+    assert entity_id not in hass.bus.async_keyed_listeners(
+        EVENT_STATE_CHANGED, ATTR_ENTITY_ID
+    )
 
 
 async def test_home_accessory(hass, hk_driver):
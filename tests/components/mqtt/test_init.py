@@ -11,6 +11,7 @@ import voluptuous as vol
 from homeassistant.components import mqtt, websocket_api
 from homeassistant.components.mqtt import debug_info
 from homeassistant.components.mqtt.mixins import MQTT_ENTITY_DEVICE_INFO_SCHEMA
+from homeassistant.components.mqtt.models import Message, SubscriptionTrie
 from homeassistant.const import (
     ATTR_DOMAIN,
     ATTR_SERVICE,
@@ -239,6 +240,43 @@ def test_validate_publish_topic():
     mqtt.valid_publish_topic("$SYS/")
 
 
+def test_subscription_trie_match():
+    """Test matching topics against the subscription trie."""
+    trie = SubscriptionTrie()
+    for topic_filter in ("a/b", "a/+", "a/#", "#", "+/b", "$SYS/#", "a/+/c"):
+        trie.add(topic_filter, topic_filter)
+
+    assert trie.match("a/b") == ["a/b", "a/+", "a/#", "#", "+/b"]
+    assert trie.match("a") == ["a/#", "#"]
+    assert trie.match("a/x/c") == ["a/#", "#", "a/+/c"]
+    assert trie.match("b/c") == ["#"]
+    assert trie.match("$SYS/broker") == ["$SYS/#"]
+
+
+def test_subscription_trie_remove():
+    """Test removing subscriptions from the subscription trie."""
+    trie = SubscriptionTrie()
+    first, second = object(), object()
+    trie.add("a/+", first)
+    trie.add("a/+", second)
+    trie.add("a/b/#", first)
+    assert trie.match("a/b") == [first, second, first]
+
+    trie.remove("a/+", first)
+    assert trie.match("a/b") == [second, first]
+    assert trie.has_values("a/+")
+
+    trie.remove("a/+", second)
+    trie.remove("a/b/#", first)
+    assert trie.match("a/b") == []
+    assert not trie.has_values("a/+")
+
+    with pytest.raises(ValueError):
+        trie.remove("a/+", first)
+    with pytest.raises(ValueError):
+        trie.remove("x/y", first)
+
+
 def test_entity_device_info_schema():
     """Test MQTT entity device info validation."""
     # just identifier
@@ -332,6 +370,32 @@ async def test_subscribe_topic(hass, mqtt_mock, calls, record_calls):
     assert len(calls) == 1
 
 
+async def test_receive_messages_in_batches(hass, mqtt_mock, calls, record_calls):
+    """Test messages from the paho thread are handled in one batch."""
+    await mqtt.async_subscribe(hass, "test-topic", record_calls)
+    await mqtt.async_subscribe(hass, "test-topic", record_calls, encoding="ascii")
+
+    def receive_messages():
+        for index in range(3):
+            mqtt_mock._mqttc.on_message(
+                None, None, Message("test-topic", f"{index}".encode(), 0, False)
+            )
+
+    with patch.object(
+        hass.loop, "call_soon_threadsafe", wraps=hass.loop.call_soon_threadsafe
+    ) as mock_call_soon:
+        await hass.async_add_executor_job(receive_messages)
+        await hass.async_block_till_done()
+
+    wakeups = [
+        call
+        for call in mock_call_soon.mock_calls
+        if call[1][0].__name__ == "_mqtt_handle_messages"
+    ]
+    assert len(wakeups) == 1
+    assert [call[0].payload for call in calls] == ["0", "0", "1", "1", "2", "2"]
+
+
 async def test_subscribe_deprecated(hass, mqtt_mock):
     """Test the subscription of a topic using deprecated callback signature."""
     calls = []
@@ -14,7 +14,12 @@ from homeassistant.components.recorder import (
     run_information_with_session,
 )
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
+from homeassistant.components.recorder.models import (
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+)
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import MATCH_ALL, STATE_LOCKED, STATE_UNLOCKED
 from homeassistant.core import Context, callback
@@ -55,21 +60,25 @@ def test_saving_state_with_exception(hass, hass_recorder, caplog):
     state = "restoring_from_db"
     attributes = {"test_attr": 5, "test_attr_10": "nice"}
 
-    def _throw_if_state_in_session(*args, **kwargs):
-        for obj in hass.data[DATA_INSTANCE].event_session:
-            if isinstance(obj, States):
-                raise OperationalError(
-                    "insert the state", "fake params", "forced to fail"
-                )
+    instance = hass.data[DATA_INSTANCE]
+    execute = instance.event_session.execute
+    failed = []
+
+    def _throw_once_if_inserting_states(clause, *args, **kwargs):
+        if not failed and getattr(clause, "table", None) is States.__table__:
+            failed.append(clause)
+            raise OperationalError("insert the state", "fake params", "forced to fail")
+        return execute(clause, *args, **kwargs)
 
     with patch("time.sleep"), patch.object(
-        hass.data[DATA_INSTANCE].event_session,
-        "flush",
-        side_effect=_throw_if_state_in_session,
+        instance.event_session,
+        "execute",
+        side_effect=_throw_once_if_inserting_states,
     ):
         hass.states.set(entity_id, "fail", attributes)
         wait_recording_done(hass)
 
+    assert failed
     assert "Error executing query" in caplog.text
     assert "Error saving events" not in caplog.text
 
@@ -432,6 +441,62 @@ def test_saving_sets_old_state(hass_recorder):
         assert states[3].old_state_id == states[1].state_id
 
 
+def test_saving_batch_sets_old_state(hass_recorder):
+    """Test old state is resolved for states written in the same batch."""
+    hass = hass_recorder()
+
+    hass.states.set("test.one", "on", {})
+    hass.states.set("test.one", "off", {})
+    hass.states.remove("test.one")
+    hass.states.set("test.one", "on", {})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States))
+        assert len(states) == 4
+        assert [state.state for state in states] == ["on", "off", None, "on"]
+        assert states[0].old_state_id is None
+        assert states[1].old_state_id == states[0].state_id
+        assert states[2].old_state_id == states[1].state_id
+        assert states[3].old_state_id is None
+        for state in states:
+            assert state.event_id is not None
+            event = session.query(Events).get(state.event_id)
+            assert event.event_type == "state_changed"
+
+    assert hass.data[DATA_INSTANCE].rows_written >= 8
+
+
+def test_saving_state_shares_attributes(hass_recorder):
+    """Test states with the same attributes share one attributes row."""
+    hass = hass_recorder()
+    attributes = {"test_attr": 5, "test_attr_10": "nice"}
+
+    hass.states.set("test.one", "on", attributes)
+    hass.states.set("test.two", "on", attributes)
+    wait_recording_done(hass)
+    hass.states.set("test.one", "off", attributes)
+    hass.states.set("test.two", "off", {"test_attr": 6})
+    wait_recording_done(hass)
+
+    # Cached row ids are looked up again in the database
+    hass.data[DATA_INSTANCE].clear_state_attributes_cache()
+    hass.states.set("test.one", "on", attributes)
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = list(session.query(States))
+        assert len(states) == 5
+        assert all(state.attributes is None for state in states)
+        assert len({state.attributes_id for state in states}) == 2
+        assert states[0].attributes_id == states[1].attributes_id
+        assert states[0].attributes_id == states[2].attributes_id
+        assert states[0].attributes_id == states[4].attributes_id
+        assert states[2].to_native().attributes == attributes
+        assert states[3].to_native().attributes == {"test_attr": 6}
+        assert session.query(StateAttributes).count() == 2
+
+
 def test_saving_state_with_serializable_data(hass_recorder, caplog):
     """Test saving data that cannot be serialized does not crash."""
     hass = hass_recorder()
@@ -5,7 +5,12 @@ from unittest.mock import patch
 
 from homeassistant.components import recorder
 from homeassistant.components.recorder.const import DATA_INSTANCE
-from homeassistant.components.recorder.models import Events, RecorderRuns, States
+from homeassistant.components.recorder.models import (
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+)
 from homeassistant.components.recorder.purge import purge_old_data
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.util import dt as dt_util
@@ -23,18 +28,19 @@ def test_purge_old_states(hass, hass_recorder):
         states = session.query(States)
         assert states.count() == 6
 
-        # run purge_old_data()
-        finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
-        assert not finished
-        assert states.count() == 4
+        # run purge_old_data() in batches of 2 rows
+        with patch("homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 2):
+            finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
+            assert not finished
+            assert states.count() == 4
 
-        finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
-        assert not finished
-        assert states.count() == 2
+            finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
+            assert not finished
+            assert states.count() == 2
 
-        finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
-        assert finished
-        assert states.count() == 2
+            finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
+            assert finished
+            assert states.count() == 2
 
 
 def test_purge_old_events(hass, hass_recorder):
@@ -46,19 +52,77 @@ def test_purge_old_events(hass, hass_recorder):
         events = session.query(Events).filter(Events.event_type.like("EVENT_TEST%"))
         assert events.count() == 6
 
-        # run purge_old_data()
-        finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
-        assert not finished
-        assert events.count() == 4
+        # run purge_old_data() in batches of 2 rows
+        with patch("homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 2):
+            finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
+            assert not finished
+            assert events.count() == 4
 
-        finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
-        assert not finished
-        assert events.count() == 2
+            finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
+            assert not finished
+            assert events.count() == 2
+
+            # we should only have 2 events left
+            finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
+            assert finished
+            assert events.count() == 2
+
+
+def test_purge_in_batches_through_queue(hass, hass_recorder):
+    """Test the recorder requeues the purge until all batches are deleted."""
+    hass = hass_recorder()
+    _add_test_states(hass)
+    _add_test_events(hass)
+    instance = hass.data[DATA_INSTANCE]
+
+    with patch("homeassistant.components.recorder.purge.MAX_ROWS_TO_PURGE", 1), patch(
+        "homeassistant.components.recorder.purge._LOGGER"
+    ) as mock_logger:
+        hass.services.call("recorder", "purge", service_data={"keep_days": 4})
+        hass.block_till_done()
+        # Each batch requeues the purge behind the queued events
+        for _ in range(5):
+            instance.block_till_done()
+            wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        assert session.query(States).count() == 2
+        assert (
+            session.query(Events).filter(Events.event_type.like("EVENT_TEST%")).count()
+            == 2
+        )
+
+    debug_messages = [call[1][0] for call in mock_logger.debug.mock_calls]
+    incomplete = [msg for msg in debug_messages if msg.startswith("Purging hasn't")]
+    assert len(incomplete) == 4
+    assert "Running incremental vacuum" in debug_messages
+    assert instance.purge_batches == 0
+    assert instance.purged_states == 0
+    assert instance.purged_events == 0
+
+
+def test_purge_unused_state_attributes(hass, hass_recorder):
+    """Test deleting state attributes no state refers to."""
+    hass = hass_recorder()
+    hass.states.set("test.recorder", "on", {"test_attr": 5})
+    wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        session.add(
+            StateAttributes(
+                hash=StateAttributes.hash_shared_attrs("{}"), shared_attrs="{}"
+            )
+        )
+
+    with session_scope(hass=hass) as session:
+        state_attributes = session.query(StateAttributes)
+        assert state_attributes.count() == 2
 
-        # we should only have 2 events left
         finished = purge_old_data(hass.data[DATA_INSTANCE], 4, repack=False)
         assert finished
-        assert events.count() == 2
+        assert [attrs.shared_attrs for attrs in state_attributes] == [
+            '{"test_attr": 5}'
+        ]
 
 
 def test_purge_old_recorder_runs(hass, hass_recorder):
@@ -138,8 +202,7 @@ def test_purge_method(hass, hass_recorder):
             hass.data[DATA_INSTANCE].block_till_done()
             wait_recording_done(hass)
             assert (
-                mock_logger.debug.mock_calls[5][1][0]
-                == "Vacuuming SQL DB to free space"
+                mock_logger.debug.mock_calls[-1][1][0] == "Running incremental vacuum"
             )
 
 
@@ -0,0 +1,95 @@
+"""The tests for the recorder long-term statistics."""
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.components.recorder import statistics
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder.models import Statistics
+from homeassistant.components.recorder.util import session_scope
+import homeassistant.util.dt as dt_util
+
+from .common import wait_recording_done
+
+
+def _record_states(hass, start):
+    """Record numeric states during the hour starting at start."""
+
+    def set_state(entity_id, state, minutes, **kwargs):
+        """Set the state at a number of minutes after start."""
+        with patch(
+            "homeassistant.components.recorder.dt_util.utcnow",
+            return_value=start + timedelta(minutes=minutes),
+        ), patch(
+            "homeassistant.core.dt_util.utcnow",
+            return_value=start + timedelta(minutes=minutes),
+        ):
+            hass.states.set(entity_id, state, **kwargs)
+            wait_recording_done(hass)
+
+    power = {"unit_of_measurement": "W"}
+    energy = {"unit_of_measurement": "kWh"}
+    set_state("sensor.power", "10", 0, attributes=power)
+    set_state("sensor.power", "unavailable", 15, attributes=power)
+    set_state("sensor.power", "30", 30, attributes=power)
+    set_state("sensor.energy", "100", 0, attributes=energy)
+    set_state("sensor.energy", "105", 30, attributes=energy)
+    set_state("sensor.energy", "2", 45, attributes=energy)
+    set_state("sensor.text", "hello", 0, attributes={})
+    set_state("sensor.no_unit", "5", 0, attributes={})
+    set_state("light.kitchen", "1", 0, attributes=power)
+    # Outside of the period
+    set_state("sensor.power", "1000", 60, attributes=power)
+
+
+def test_compile_statistics(hass_recorder):
+    """Test compiling hourly statistics."""
+    hass = hass_recorder()
+    instance = hass.data[DATA_INSTANCE]
+    start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(
+        hours=3
+    )
+    _record_states(hass, start)
+
+    statistics.compile_statistics(instance, start)
+    # A compiled period is not compiled twice
+    statistics.compile_statistics(instance, start)
+
+    with session_scope(hass=hass) as session:
+        assert session.query(Statistics).count() == 2
+
+    stats = statistics.statistics_during_period(hass, start)
+    assert list(stats) == ["sensor.energy", "sensor.power"]
+
+    power = stats["sensor.power"]
+    assert len(power) == 1
+    assert power[0]["start"] == start
+    # 10 W for 30 minutes (unavailable is ignored) and 30 W for 30 minutes
+    assert power[0]["mean"] == pytest.approx(20)
+    assert power[0]["min"] == 10
+    assert power[0]["max"] == 30
+    assert power[0]["sum"] is None
+
+    energy = stats["sensor.energy"]
+    assert energy[0]["min"] == 2
+    assert energy[0]["max"] == 105
+    # Increased by 5 then reset and increased by 2
+    assert energy[0]["sum"] == pytest.approx(7)
+
+    assert statistics.statistics_during_period(
+        hass, start, entity_ids=["sensor.power"]
+    ) == {"sensor.power": power}
+    assert statistics.statistics_during_period(hass, start, start) == {}
+
+
+def test_get_start_time():
+    """Test the start of the last full period."""
+    now = dt_util.utcnow().replace(hour=12, minute=12, second=5)
+    with patch(
+        "homeassistant.components.recorder.statistics.dt_util.utcnow",
+        return_value=now,
+    ):
+        assert statistics.get_start_time() == now.replace(
+            hour=11, minute=0, second=0, microsecond=0
+        )
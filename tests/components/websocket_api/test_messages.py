@@ -1,7 +1,9 @@
 """Test Websocket API messages module."""
+import json
 
+from homeassistant.components.websocket_api.const import JSON_DUMP
 from homeassistant.components.websocket_api.messages import (
-    _cached_event_message as lru_event_cache,
+    _cached_event_json as lru_event_cache,
     cached_event_message,
     message_to_json,
 )
@@ -72,12 +74,49 @@ async def test_cached_event_message_with_different_idens(hass):
     assert msg0 != msg1
     assert msg0 != msg2
 
+    assert json.loads(msg0) == {
+        "id": 2,
+        "type": "event",
+        "event": json.loads(JSON_DUMP(events[0])),
+    }
+    assert json.loads(msg1)["id"] == 3
+    assert json.loads(msg2)["id"] == 4
+    assert json.loads(msg1)["event"] == json.loads(msg0)["event"]
+
     cache_info = lru_event_cache.cache_info()
     assert cache_info.hits == 2
     assert cache_info.misses == 1
     assert cache_info.currsize == 1
 
 
+async def test_cached_event_message_unserializable(hass, caplog):
+    """Test an event that cannot be serialized results in an error message."""
+
+    events = []
+
+    @callback
+    def _event_listener(event):
+        events.append(event)
+
+    hass.bus.async_listen("test_event", _event_listener)
+
+    hass.bus.async_fire("test_event", {"bad": _Unserializeable()})
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+
+    msg = cached_event_message(5, events[0])
+
+    assert json.loads(msg) == {
+        "id": 5,
+        "type": "result",
+        "success": False,
+        "error": {"code": "unknown_error", "message": "Invalid JSON in response"},
+    }
+    assert "Unable to serialize to JSON" in caplog.text
+    assert "$(event: test_event).data.bad" in caplog.text
+
+
 async def test_message_to_json(caplog):
     """Test we can serialize websocket messages."""
 
@@ -6,7 +6,7 @@ from unittest.mock import Mock, patch
 
 import pytest
 
-from homeassistant.const import PERCENTAGE
+from homeassistant.const import EVENT_STATE_CHANGED, PERCENTAGE
 from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError, PlatformNotReady
 from homeassistant.helpers import entity_platform, entity_registry
@@ -22,6 +22,7 @@ from tests.common import (
     MockEntity,
     MockEntityPlatform,
     MockPlatform,
+    async_capture_events,
     async_fire_time_changed,
     mock_entity_platform,
     mock_registry,
@@ -1014,6 +1015,38 @@ async def test_two_platforms_add_same_entity(hass):
     assert entity2 in entities
 
 
+async def test_deferred_state_writes(hass):
+    """Test deferring and flushing the state writes of a platform."""
+    platform = MockEntityPlatform(hass)
+    entity1 = MockEntity(name="entity_1", state="on")
+    entity2 = MockEntity(name="entity_2", state="on")
+    await platform.async_add_entities([entity1, entity2])
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    platform.async_defer_state_writes()
+    entity1._values["state"] = "off"
+    entity1.async_write_ha_state()
+    entity2._values["state"] = "off"
+    entity2.async_write_ha_state()
+    entity1._values["state"] = "idle"
+    entity1.async_write_ha_state()
+
+    assert hass.states.get("test_domain.entity_1").state == "on"
+    assert events == []
+
+    platform.async_flush_state_writes()
+    await hass.async_block_till_done()
+
+    assert hass.states.get("test_domain.entity_1").state == "idle"
+    assert hass.states.get("test_domain.entity_2").state == "off"
+    assert len(events) == 2
+    assert events[0].context is events[1].context
+
+    entity2._values["state"] = "on"
+    entity2.async_write_ha_state()
+    assert hass.states.get("test_domain.entity_2").state == "on"
+
+
 class SlowEntity(MockEntity):
     """An entity that will sleep during add."""
 
@@ -2253,6 +2253,47 @@ async def test_track_template_with_time_that_leaves_scope(hass):
     info.async_remove()
 
 
+async def test_track_template_result_skips_render_with_unchanged_states(hass):
+    """Test templates are only rendered again when the states they read change."""
+    hass.states.async_set("sensor.one", "1")
+    hass.states.async_set("sensor.two", "2")
+    template_one = Template("{{ states('sensor.one') }}", hass)
+    template_two = Template("{{ states('sensor.two') }}", hass)
+    template_random = Template("{{ [states('sensor.one'), 'x'] | random }}", hass)
+    runs = []
+
+    @ha.callback
+    def refresh_listener(event, updates):
+        runs.append({update.template: update.result for update in updates})
+
+    info = async_track_template_result(
+        hass,
+        [
+            TrackTemplate(template_one, None),
+            TrackTemplate(template_two, None),
+            TrackTemplate(template_random, None),
+        ],
+        refresh_listener,
+    )
+    info.async_refresh()
+    assert runs[0][template_one] == 1
+    assert runs[0][template_two] == 2
+    assert info.render_cache_stats == {"hits": 2, "misses": 1}
+
+    info.async_refresh()
+    assert info.render_cache_stats == {"hits": 4, "misses": 2}
+
+    hass.states.async_set("sensor.one", "3")
+    await hass.async_block_till_done()
+    assert runs[-1][template_one] == 3
+    assert info.render_cache_stats == {"hits": 4, "misses": 4}
+
+    info.async_refresh()
+    assert info.render_cache_stats == {"hits": 6, "misses": 5}
+
+    info.async_remove()
+
+
 async def test_async_track_template_result_multiple_templates_mixing_listeners(hass):
     """Test tracking multiple templates with mixing listener types."""
 
@@ -1540,6 +1540,32 @@ async def test_referenced_devices(hass):
     assert script_obj.referenced_devices is script_obj.referenced_devices
 
 
+def test_reference_index():
+    """Test the index of referenced entities and devices."""
+    index = script.ReferenceIndex()
+    index.async_add("script.first", {"light.both", "light.first"}, {"dev-both"})
+    index.async_add("script.second", {"light.both"}, {"dev-both", "dev-second"})
+
+    assert index.async_referencing_entity("light.both") == [
+        "script.first",
+        "script.second",
+    ]
+    assert index.async_referencing_entity("light.first") == ["script.first"]
+    assert index.async_referencing_device("dev-second") == ["script.second"]
+    assert index.async_referencing_device("dev-unknown") == []
+
+    # Adding again replaces the references
+    index.async_add("script.first", {"light.other"}, set())
+    assert index.async_referencing_entity("light.first") == []
+    assert index.async_referencing_entity("light.other") == ["script.first"]
+    assert index.async_referencing_device("dev-both") == ["script.second"]
+
+    index.async_remove("script.second")
+    index.async_remove("script.unknown")
+    assert index.async_referencing_entity("light.both") == []
+    assert index.async_referencing_device("dev-both") == []
+
+
 @contextmanager
 def does_not_raise():
     """Indicate no exception is expected."""
@@ -2055,35 +2055,52 @@ def test_urlencode(hass):
     assert tpl.async_render() == "the%20quick%20brown%20fox%20%3D%20true"
 
 
-async def test_cache_garbage_collection():
-    """Test caching a template."""
-    template_string = (
-        "{% set dict = {'foo': 'x&y', 'bar': 42} %} {{ dict | urlencode }}"
-    )
-    tpl = template.Template(
-        (template_string),
-    )
-    tpl.ensure_valid()
-    assert template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
+async def test_template_cache_eviction():
+    """Test compiled templates are cached by source and evicted when unused."""
+    with patch.object(template, "TEMPLATE_CACHE_SIZE", 2):
+        env = template.TemplateEnvironment(None)
+
+    env.compile("{{ 1 }}")
+    env.compile("{{ 2 }}")
+    assert env.template_cache.get("{{ 1 }}")
+    env.compile("{{ 3 }}")
+    assert env.template_cache.get("{{ 1 }}")
+    assert not env.template_cache.get("{{ 2 }}")
+    assert env.template_cache.get("{{ 3 }}")
+
+
+async def test_identical_templates_share_compiled(hass):
+    """Test identical templates render with the same compiled template."""
+    tpl = template.Template("{{ 'x' | upper }}", hass)
+    tpl2 = template.Template("{{ 'x' | upper }}", hass)
+    assert tpl.async_render() == tpl2.async_render() == "X"
+    assert tpl._compiled is tpl2._compiled  # pylint: disable=protected-access
+
+
+async def test_precompile_templates(hass):
+    """Test precompiling the template strings of a configuration."""
+    config = {
+        "sensor": [
+            {"value_template": " {{ states('sensor.precompiled') }} "},
+            {"value_template": "{{ invalid"},
+            {"name": "not a template"},
+        ]
+    }
+    await template.async_precompile_templates(hass, config)
 
-    tpl2 = template.Template(
-        (template_string),
+    env = hass.data[template._ENVIRONMENT]  # pylint: disable=protected-access
+    source = "{{ states('sensor.precompiled') }}"
+    assert env.compiled_cache.get(source)
+    assert template._NO_HASS_ENV.template_cache.get(  # pylint: disable=protected-access
+        source
     )
-    tpl2.ensure_valid()
-    assert template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
+    assert not env.compiled_cache.get("not a template")
 
-    del tpl
-    assert template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
-    del tpl2
-    assert not template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
+    with patch("jinja2.Template.from_code") as mock_from_code:
+        tpl = template.Template(source, hass)
+        tpl.ensure_valid()
+        assert tpl.async_render() == "unknown"
+    assert not mock_from_code.called
 
 
 def test_is_template_string():
@@ -2224,6 +2241,48 @@ async def test_template_timeout(hass):
     assert await tmp5.async_render_will_timeout(0.000001) is True
 
 
+async def test_async_render_to_info_in_worker(hass):
+    """Test rendering templates in the worker pool."""
+    hass.states.async_set("sensor.one", "1")
+    hass.states.async_set("light.one", "on")
+
+    tmp = template.Template("{{ states('sensor.one') | int + var1 }}", hass)
+    info = await tmp.async_render_to_info_in_worker(3, {"var1": 2})
+    assert info.result() == 3
+    assert info.entities == {"sensor.one"}
+    assert info.inputs_unchanged()
+
+    tmp2 = template.Template("{{ states.light | count }}", hass)
+    info = await tmp2.async_render_to_info_in_worker(3)
+    assert info.result() == 1
+    assert info.domains_lifecycle == {"light"}
+
+    tmp3 = template.Template("{{ error_invalid + 1 }}", hass)
+    info = await tmp3.async_render_to_info_in_worker(3)
+    with pytest.raises(TemplateError):
+        info.result()
+
+    tmp4 = template.Template("static", hass)
+    info = await tmp4.async_render_to_info_in_worker(3)
+    assert info.result() == "static"
+
+    slow_template_str = """
+{% for var in range(1000) -%}
+  {% for var in range(1000) -%}
+    {{ var }}
+  {%- endfor %}
+{%- endfor %}
+"""
+    tmp5 = template.Template(slow_template_str, hass)
+    info = await tmp5.async_render_to_info_in_worker(0.000001)
+    with pytest.raises(TemplateError, match="Exceeded maximum execution time"):
+        info.result()
+
+    # The interrupted worker renders again
+    info = await tmp.async_render_to_info_in_worker(3, {"var1": 4})
+    assert info.result() == 5
+
+
 async def test_lights(hass):
     """Test we can sort lights."""
 
@@ -34,6 +34,7 @@ from homeassistant.const import (
 )
 import homeassistant.core as ha
 from homeassistant.exceptions import (
+    HomeAssistantError,
     InvalidEntityFormatError,
     InvalidStateError,
     ServiceNotFound,
@@ -471,6 +472,155 @@ async def test_eventbus_coroutine_event_listener(hass):
     assert len(coroutine_calls) == 1
 
 
+async def test_eventbus_callback_listener_runs_inline(hass):
+    """Test callback listeners run before async_fire returns."""
+    callback_calls = []
+
+    @ha.callback
+    def callback_listener(event):
+        callback_calls.append(event)
+
+    @ha.callback
+    def bad_listener(event):
+        raise ValueError("boom")
+
+    hass.bus.async_listen("test_inline", bad_listener)
+    hass.bus.async_listen("test_inline", callback_listener)
+    hass.bus.async_fire("test_inline")
+    assert len(callback_calls) == 1
+
+
+async def test_eventbus_match_all_snapshot_invalidated(hass):
+    """Test MATCH_ALL listeners are merged and snapshots are refreshed."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        calls.append(("typed", event.event_type))
+
+    @ha.callback
+    def match_all_listener(event):
+        calls.append(("all", event.event_type))
+
+    unsub = hass.bus.async_listen("test_snapshot", listener)
+    hass.bus.async_fire("test_snapshot")
+    assert calls == [("typed", "test_snapshot")]
+
+    unsub_all = hass.bus.async_listen(MATCH_ALL, match_all_listener)
+    hass.bus.async_fire("test_snapshot")
+    assert calls[1:] == [("all", "test_snapshot"), ("typed", "test_snapshot")]
+
+    unsub()
+    unsub_all()
+    hass.bus.async_fire("test_snapshot")
+    assert len(calls) == 3
+
+    unsub_all = hass.bus.async_listen(MATCH_ALL, match_all_listener)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    assert len(calls) == 3
+    unsub_all()
+
+
+async def test_eventbus_dispatch_stats(hass):
+    """Test the event bus keeps dispatch counters per event type."""
+
+    @ha.callback
+    def listener(event):
+        pass
+
+    async def coroutine_listener(event):
+        pass
+
+    hass.bus.async_listen("test_stats", listener)
+    hass.bus.async_listen("test_stats", coroutine_listener)
+    hass.bus.async_fire("test_stats")
+    hass.bus.async_fire("test_stats")
+    hass.bus.async_fire("test_stats_no_listeners")
+    await hass.async_block_till_done()
+
+    stats = hass.bus.async_dispatch_stats()
+    assert stats["test_stats"]["fired"] == 2
+    assert stats["test_stats"]["listener_calls"] == 4
+    assert stats["test_stats"]["duration"] >= 0
+    assert stats["test_stats_no_listeners"] == {
+        "fired": 1,
+        "listener_calls": 0,
+        "duration": 0.0,
+    }
+
+
+async def test_eventbus_event_filter(hass):
+    """Test listeners are only called for events passing their filter."""
+    calls = []
+
+    async def listener(event):
+        calls.append(event)
+
+    @ha.callback
+    def event_filter(event):
+        return event.data["wanted"]
+
+    hass.bus.async_listen("test_filter", listener, event_filter=event_filter)
+    hass.bus.async_fire("test_filter", {"wanted": False})
+    hass.bus.async_fire("test_filter", {"wanted": True})
+    await hass.async_block_till_done()
+
+    assert len(calls) == 1
+    assert calls[0].data == {"wanted": True}
+    assert hass.bus.async_dispatch_stats()["test_filter"]["listener_calls"] == 1
+
+    # Broken filters are logged and treated as not matching
+    hass.bus.async_fire("test_filter", {})
+    await hass.async_block_till_done()
+    assert len(calls) == 1
+
+    with pytest.raises(HomeAssistantError):
+        hass.bus.async_listen("test_filter", listener, event_filter=lambda event: True)
+
+
+async def test_eventbus_keyed_listener(hass):
+    """Test keyed listeners are routed by an event data key."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        calls.append(event.data["entity_id"])
+
+    unsub = hass.bus.async_listen_keyed(
+        "test_keyed", "entity_id", ["light.kitchen", "light.hall"], listener
+    )
+    unsub_other = hass.bus.async_listen_keyed(
+        "test_keyed", "entity_id", ["light.kitchen"], listener
+    )
+    assert hass.bus.async_listeners()["test_keyed"] == 2
+    assert hass.bus.async_keyed_listeners("test_keyed", "entity_id") == {
+        "light.kitchen": 2,
+        "light.hall": 1,
+    }
+
+    hass.bus.async_fire("test_keyed", {"entity_id": "light.kitchen"})
+    hass.bus.async_fire("test_keyed", {"entity_id": "light.hall"})
+    hass.bus.async_fire("test_keyed", {"entity_id": "light.bedroom"})
+    hass.bus.async_fire("test_keyed", {"entity_id": ["light.kitchen"]})
+    hass.bus.async_fire("test_keyed")
+    assert calls == ["light.kitchen", "light.kitchen", "light.hall"]
+
+    unsub()
+    unsub()
+    assert hass.bus.async_keyed_listeners("test_keyed", "entity_id") == {
+        "light.kitchen": 1
+    }
+    hass.bus.async_fire("test_keyed", {"entity_id": "light.hall"})
+    assert len(calls) == 3
+
+    unsub_other()
+    assert "test_keyed" not in hass.bus.async_listeners()
+    assert hass.bus.async_keyed_listeners("test_keyed", "entity_id") == {}
+
+    with pytest.raises(HomeAssistantError):
+        hass.bus.async_listen_keyed(MATCH_ALL, "entity_id", ["light.hall"], listener)
+
+
 def test_state_init():
     """Test state.init."""
     with pytest.raises(InvalidEntityFormatError):
@@ -637,6 +787,122 @@ async def test_statemachine_force_update(hass):
     assert len(events) == 1
 
 
+async def test_statemachine_shares_unchanged_attributes(hass):
+    """Test unchanged attributes are shared with the previous state."""
+    hass.states.async_set("sensor.power", "10", {"unit": "W"})
+    first = hass.states.get("sensor.power")
+
+    hass.states.async_set("sensor.power", "12", {"unit": "W"})
+    second = hass.states.get("sensor.power")
+    assert second.state == "12"
+    assert second.attributes is first.attributes
+
+    hass.states.async_set("sensor.power", "12", second.attributes)
+    assert hass.states.get("sensor.power") is second
+
+    hass.states.async_set("sensor.power", "12", {"unit": "kW"})
+    third = hass.states.get("sensor.power")
+    assert third.attributes == {"unit": "kW"}
+    assert third.attributes is not second.attributes
+
+
+def test_state_shares_empty_attributes():
+    """Test states without attributes share one empty mapping."""
+    assert ha.State("light.bowl", "on").attributes is ha.State(
+        "light.desk", "off", {}
+    ).attributes
+
+
+async def test_statemachine_set_many(hass):
+    """Test setting multiple states in one batch."""
+    hass.states.async_set("light.bowl", "on", {"brightness": 100})
+    hass.states.async_set("light.ceiling", "off")
+    hass.states.async_set("light.desk", "on")
+    old_bowl = hass.states.get("light.bowl")
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    seen = []
+
+    @ha.callback
+    def verify_batch_applied(event):
+        """Verify the whole batch is visible to listeners."""
+        seen.append(
+            (
+                hass.states.get("light.ceiling").state,
+                hass.states.get("sensor.new").state,
+            )
+        )
+
+    hass.bus.async_listen(EVENT_STATE_CHANGED, verify_batch_applied)
+
+    context = ha.Context()
+    hass.states.async_set_many(
+        [
+            ("light.bowl", "on", {"brightness": 200}),
+            ("Light.Ceiling", "on", None),
+            ("light.desk", "on", None),
+            ("sensor.new", 12, {"unit": "W"}),
+        ],
+        context=context,
+    )
+    await hass.async_block_till_done()
+
+    assert [event.data["entity_id"] for event in events] == [
+        "light.bowl",
+        "light.ceiling",
+        "sensor.new",
+    ]
+    assert seen == [("on", "12")] * 3
+
+    bowl = hass.states.get("light.bowl")
+    ceiling = hass.states.get("light.ceiling")
+    new = hass.states.get("sensor.new")
+    assert bowl.attributes == {"brightness": 200}
+    assert bowl.last_changed == old_bowl.last_changed
+    assert bowl.last_updated == ceiling.last_updated == new.last_updated
+    assert bowl.context is ceiling.context is new.context is context
+    assert all(event.context is context for event in events)
+    assert all(event.time_fired == new.last_updated for event in events)
+    assert new.state == "12"
+    assert events[2].data["old_state"] is None
+
+
+async def test_statemachine_set_many_shares_new_context(hass):
+    """Test a batch without context gets a single new context."""
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+
+    hass.states.async_set_many([("light.bowl", "on", None), ("light.desk", "on", None)])
+    await hass.async_block_till_done()
+
+    assert len(events) == 2
+    assert events[0].context is events[1].context
+
+    hass.states.async_set_many([("light.bowl", "on", None), ("light.desk", "on", None)])
+    await hass.async_block_till_done()
+    assert len(events) == 2
+
+    hass.states.async_set_many([("light.bowl", "on", None)], force_update=True)
+    await hass.async_block_till_done()
+    assert len(events) == 3
+
+
+async def test_eventbus_fire_many(hass):
+    """Test firing a batch of events."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Record the event."""
+        calls.append(event)
+
+    hass.bus.async_listen("test_event", listener)
+
+    hass.bus.async_fire_many("test_event", [{"idx": 1}, {"idx": 2}, None])
+
+    assert [event.data for event in calls] == [{"idx": 1}, {"idx": 2}, {}]
+    assert hass.bus.async_dispatch_stats()["test_event"]["fired"] == 3
+
+
 def test_service_call_repr():
     """Test ServiceCall repr."""
     call = ha.ServiceCall("homeassistant", "start")
@@ -972,8 +1238,8 @@ def test_create_timer(mock_monotonic, loop):
     ):
         ha._async_create_timer(hass)
 
-    assert len(funcs) == 2
-    fire_time_event, stop_timer = funcs
+    assert len(funcs) == 3
+    fire_time_event, _, stop_timer = funcs
 
     assert len(hass.loop.call_later.mock_calls) == 1
     delay, callback, target = hass.loop.call_later.mock_calls[0][1]
@@ -1047,8 +1313,8 @@ def test_timer_out_of_sync(mock_monotonic, loop):
 
         assert event_context_0 == event_context_1
 
-        assert len(funcs) == 2
-        fire_time_event, _ = funcs
+        assert len(funcs) == 3
+        fire_time_event, _, _ = funcs
 
     assert len(hass.loop.call_later.mock_calls) == 2
 
@@ -1058,6 +1324,37 @@ def test_timer_out_of_sync(mock_monotonic, loop):
     assert abs(target - 14.2) < 0.001
 
 
+async def test_timer_only_ticks_with_time_changed_listeners(hass):
+    """Test the timer is idle until something listens for time changed."""
+    with patch.object(hass.loop, "call_later") as mock_call_later:
+        ha._async_create_timer(hass)
+        assert len(mock_call_later.mock_calls) == 0
+
+        unsub = hass.bus.async_listen(EVENT_TIME_CHANGED, lambda event: None)
+        assert len(mock_call_later.mock_calls) == 1
+
+        # Adding more listeners does not schedule another tick
+        unsub_second = hass.bus.async_listen(EVENT_TIME_CHANGED, lambda event: None)
+        assert len(mock_call_later.mock_calls) == 1
+
+        _, fire_time_event, target = mock_call_later.mock_calls[0][1]
+        fire_time_event(target)
+        assert len(mock_call_later.mock_calls) == 2
+
+        unsub()
+        unsub_second()
+        fire_time_event(target)
+        assert len(mock_call_later.mock_calls) == 2
+
+
+async def test_match_all_does_not_get_time_changed(hass):
+    """Test MATCH_ALL listeners do not receive time changed events."""
+    events = async_capture_events(hass, MATCH_ALL)
+    hass.bus.async_fire(EVENT_TIME_CHANGED, {ATTR_NOW: dt_util.utcnow()})
+    await hass.async_block_till_done()
+    assert events == []
+
+
 async def test_hass_start_starts_the_timer(loop):
     """Test when hass starts, it starts the timer."""
     hass = ha.HomeAssistant()
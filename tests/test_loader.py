@@ -1,4 +1,5 @@
 """Test to verify that we can load components."""
+import sys
 from unittest.mock import ANY, patch
 
 import pytest
@@ -449,3 +450,83 @@ async def test_get_custom_components_safe_mode(hass):
     """Test that we get empty custom components in safe mode."""
     hass.config.safe_mode = True
     assert await loader.async_get_custom_components(hass) == {}
+
+
+async def test_preload_integrations(hass):
+    """Test preloading integrations imports them and their platforms."""
+    hass.config.skip_pip = True
+    group = await loader.async_get_integration(hass, "group")
+
+    import_times = await loader.async_preload_integrations(
+        hass, [group], {"light", "config", "not_a_platform"}
+    )
+
+    assert list(import_times) == ["group"]
+    assert "homeassistant.components.group.light" in sys.modules
+    assert "homeassistant.components.group.config" not in sys.modules
+    assert not hass.data[loader.DATA_PRELOADS]
+
+
+async def test_preload_integrations_dependencies_first(hass):
+    """Test integrations are imported after their dependencies."""
+    hass.config.skip_pip = True
+    api = await loader.async_get_integration(hass, "api")
+    http_integration = await loader.async_get_integration(hass, "http")
+    imported = []
+
+    def mock_import(integration, platforms):
+        imported.append(integration.domain)
+        return 0.1
+
+    with patch("homeassistant.loader._import_integration", side_effect=mock_import):
+        import_times = await loader.async_preload_integrations(
+            hass, [api, http_integration], set()
+        )
+
+    assert imported == ["http", "api"]
+    assert import_times == {"http": 0.1, "api": 0.1}
+
+
+async def test_integration_index(hass, hass_storage):
+    """Test integrations are resolved from the index on the next start."""
+    http_integration = await loader.async_get_integration(hass, "http")
+    await loader.async_save_integration_index(hass)
+    stored = hass_storage[loader.INTEGRATION_INDEX_STORAGE_KEY]["data"]
+    assert "homeassistant.components.http" in stored["entries"]
+
+    # Next start
+    hass.data.pop(loader.DATA_INTEGRATIONS)
+    hass.data.pop(loader.DATA_INTEGRATION_INDEX)
+    with patch("homeassistant.loader.Integration.resolve_from_root") as mock_resolve:
+        integration = await loader.async_get_integration(hass, "http")
+    assert not mock_resolve.called
+    assert integration is not http_integration
+    assert integration.manifest == http_integration.manifest
+    assert integration.file_path == http_integration.file_path
+
+    # A changed manifest is read again
+    stored["entries"]["homeassistant.components.http"]["mtime"] -= 1
+    hass.data.pop(loader.DATA_INTEGRATIONS)
+    hass.data.pop(loader.DATA_INTEGRATION_INDEX)
+    with patch(
+        "homeassistant.loader.Integration.resolve_from_root",
+        return_value=http_integration,
+    ) as mock_resolve:
+        await loader.async_get_integration(hass, "http")
+    assert mock_resolve.called
+
+
+async def test_integration_index_other_version(hass, hass_storage):
+    """Test the index of another version is not used."""
+    http_integration = await loader.async_get_integration(hass, "http")
+    await loader.async_save_integration_index(hass)
+    hass_storage[loader.INTEGRATION_INDEX_STORAGE_KEY]["data"]["ha_version"] = "0.1"
+
+    hass.data.pop(loader.DATA_INTEGRATIONS)
+    hass.data.pop(loader.DATA_INTEGRATION_INDEX)
+    with patch(
+        "homeassistant.loader.Integration.resolve_from_root",
+        return_value=http_integration,
+    ) as mock_resolve:
+        await loader.async_get_integration(hass, "http")
+    assert mock_resolve.called